@@ -7,12 +7,12 @@ import os
 import json
 from scraper import RealEstateScraper
 from news_scraper import NewsScraperService
+from http_client import get_http_client
 from models import db, Property, SearchCriteria, ScrapingLog, News
 from sheets_handler import GoogleSheetsHandler
 import pandas as pd
 from config import Config
 import logging
-import asyncio
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -58,8 +58,10 @@ def start_scraper():
         scraper = RealEstateScraper()
         urls = app.config.get('PROPERTY_URLS', [])
         if urls and urls[0]:  # Check if URLs list is not empty and first item is not empty
-            asyncio.run(scraper.scrape_urls(urls))
+            # Run on the shared client loop so pooled connections survive between runs
+            get_http_client().run(scraper.scrape_urls(urls))
         logger.info("Property scraper started successfully")
+        logger.info(f"HTTP pool stats: {get_http_client().stats()}")
     except Exception as e:
         logger.error(f"Error starting property scraper: {str(e)}")
 
@@ -68,8 +70,9 @@ def start_news_scraper():
     try:
         news_scraper = NewsScraperService()
         urls = app.config.get('NEWS_URLS', [])
-        news_scraper.scrape_news(urls)
+        get_http_client().run(news_scraper.scrape_news(urls))
         logger.info("News scraper started successfully")
+        logger.info(f"HTTP pool stats: {get_http_client().stats()}")
     except Exception as e:
         logger.error(f"Error starting news scraper: {str(e)}")
 
@@ -159,6 +162,18 @@ def api_properties():
         logger.error(f"Error in api_properties route: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/http-stats')
+def api_http_stats():
+    """API endpoint for shared HTTP connection pool statistics"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'stats': get_http_client().stats()
+        })
+    except Exception as e:
+        logger.error(f"Error in api_http_stats route: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/scrape', methods=['POST'])
 async def scrape_properties():
     """Endpoint to trigger property scraping"""
@@ -0,0 +1,86 @@
+import argparse
+import functools
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from browser_profile import block_resources, blocked_url_patterns, chrome_options
+from website_manager import WebsiteManager
+
+# Requests the page made, as the browser saw them
+RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length"
+
+def load_urls_from_file(file_path):
+    with open(file_path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_directory(directory):
+    """Serve saved pages (and the assets saved next to them) on a local port"""
+    handler = functools.partial(QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def saved_page_urls(server, directory):
+    port = server.server_address[1]
+    return [f"http://127.0.0.1:{port}/{path.name}" for path in sorted(Path(directory).glob('*.html'))]
+
+def measure(driver, urls, rounds):
+    """Average seconds per driver.get() and requests per page"""
+    timings = []
+    requests = []
+    for _ in range(rounds):
+        for url in urls:
+            started = time.perf_counter()
+            driver.get(url)
+            timings.append(time.perf_counter() - started)
+            requests.append(driver.execute_script(RESOURCE_COUNT_SCRIPT))
+    return sum(timings) / len(timings), sum(requests) / len(requests)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare page loads with the full and lean browser profiles')
+    parser.add_argument('--urls', type=str, help='Path to file containing URLs to load (one per line)')
+    parser.add_argument('--pages', type=str, default='fixtures', help='Directory of saved .html pages (used without --urls)')
+    parser.add_argument('--rounds', type=int, default=3, help='Times each page is loaded per profile')
+    args = parser.parse_args()
+
+    server = None
+    if args.urls:
+        urls = load_urls_from_file(args.urls)
+    else:
+        server = serve_directory(args.pages)
+        urls = saved_page_urls(server, args.pages)
+    if not urls:
+        print("No pages to benchmark")
+        return
+
+    settings = WebsiteManager().get_settings()
+    service = Service(ChromeDriverManager().install())
+    print(f"Loading {len(urls)} pages, {args.rounds} rounds each\n")
+    print(f"{'profile':<10}{'ms/page':>12}{'requests/page':>16}")
+    try:
+        for profile in ('full', 'lean'):
+            lean = profile == 'lean'
+            driver = webdriver.Chrome(service=service, options=chrome_options(settings.get('user_agent'), lean))
+            try:
+                if lean:
+                    block_resources(driver, blocked_url_patterns(settings))
+                # One warm-up load so browser start-up is not counted
+                driver.get(urls[0])
+                seconds, requests = measure(driver, urls, args.rounds)
+                print(f"{profile:<10}{seconds * 1000:>12.0f}{requests:>16.1f}")
+            finally:
+                driver.quit()
+    finally:
+        if server:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import random
+import re
+import time
+from keyword_matcher import HEBREW_PREFIXES, PropertyClassifier
+from website_manager import WebsiteManager
+
+# Everyday words the synthetic posts are padded with
+FILLER = [
+    'להשכרה', 'למכירה', 'מיקום', 'מעולה', 'חניה', 'מעלית', 'קומה', 'מטר', 'מרכזי', 'ליד', 'רחוב', 'תל', 'אביב',
+    'חיפה', 'ירושלים', 'מחיר', 'גמיש', 'כניסה', 'מיידית', 'פרטים', 'בפרטי', 'מרווח', 'משופץ', 'חדש', 'נוף',
+    'for', 'rent', 'sale', 'great', 'location', 'parking', 'call', 'now', 'sqm', 'floor', 'price', 'new'
+]
+
+def synthetic_posts(keywords, count, words_per_post, seed):
+    """Posts of filler words with a few keywords, some carrying Hebrew prefixes"""
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=words_per_post)
+        for _ in range(rng.randint(0, 3)):
+            keyword = rng.choice(keywords)
+            if rng.random() < 0.4 and re.match(r'[א-ת]', keyword):
+                keyword = rng.choice(HEBREW_PREFIXES) + keyword
+            words.insert(rng.randrange(len(words) + 1), keyword)
+        posts.append(' '.join(words))
+    return posts
+
+def naive_classify(vocabulary, text):
+    """The per-keyword substring scan the automaton replaces"""
+    text = text.lower()
+    return [keyword for keyword in vocabulary if keyword in text]
+
+def posts_per_second(posts, work, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for post in posts:
+            work(post)
+    elapsed = time.perf_counter() - started
+    return len(posts) * rounds / elapsed if elapsed else float('inf')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark keyword classification over a synthetic post corpus')
+    parser.add_argument('--posts', type=int, default=20000, help='Number of synthetic posts')
+    parser.add_argument('--words', type=int, default=60, help='Filler words per post')
+    parser.add_argument('--extra-keywords', type=int, nargs='+', default=[0, 500, 5000],
+                        help='Synthetic keywords added to the configured vocabulary, one run per value')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over the corpus per method')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    config = WebsiteManager().config
+    base = PropertyClassifier.from_config(config)
+    facebook_settings = config.get('facebook_settings') or {}
+    vocabulary = list(facebook_settings.get('commercial_keywords') or []) + list(facebook_settings.get('exclude_keywords') or [])
+    for types in (config.get('commercial_property_types') or {}).values():
+        for words in types.values():
+            vocabulary.extend(words)
+    posts = synthetic_posts(vocabulary, args.posts, args.words, args.seed)
+    total_kb = sum(len(post.encode('utf-8')) for post in posts) / 1024
+    print(f"{len(posts)} posts ({total_kb:.0f} KB), {args.rounds} rounds each\n")
+    print(f"{'keywords':>10}{'naive posts/s':>16}{'automaton posts/s':>20}{'build ms':>10}")
+
+    for extra in args.extra_keywords:
+        extra_keywords = [f'מילה{number}' for number in range(extra)]
+        started = time.perf_counter()
+        classifier = base if not extra else PropertyClassifier(
+            commercial_keywords=list(facebook_settings.get('commercial_keywords') or []) + extra_keywords,
+            residential_keywords=facebook_settings.get('exclude_keywords'),
+            property_types=config.get('commercial_property_types')
+        )
+        build_ms = (time.perf_counter() - started) * 1000
+        keywords = vocabulary + extra_keywords
+        naive_rate = posts_per_second(posts, lambda post: naive_classify(keywords, post), args.rounds)
+        automaton_rate = posts_per_second(posts, classifier.classify, args.rounds)
+        print(f"{len(keywords):>10}{naive_rate:>16.0f}{automaton_rate:>20.0f}{build_ms:>10.0f}")
+
+if __name__ == "__main__":
+    main()
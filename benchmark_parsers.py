@@ -0,0 +1,106 @@
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+import requests
+from yarl import URL
+from html_parser import available_backends, make_soup
+from listing_extractor import container_strainer, extract_page
+from scraper import RealEstateScraper
+from website_manager import WebsiteManager
+
+def load_urls_from_file(file_path):
+    with open(file_path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def download_pages(urls):
+    """Download each page once so every backend parses the same bytes"""
+    user_agent = WebsiteManager().get_settings().get('user_agent', 'Mozilla/5.0')
+    pages = []
+    for url in urls:
+        try:
+            response = requests.get(url, headers={'User-Agent': user_agent}, timeout=30)
+            response.raise_for_status()
+            pages.append((url, response.text))
+        except Exception as e:
+            print(f"Skipping {url}: {str(e)}")
+    return pages
+
+def load_saved_pages(directory):
+    return [(f"https://{path.stem}.local/", path.read_text(encoding='utf-8'))
+            for path in sorted(Path(directory).glob('*.html'))]
+
+def pages_per_second(pages, work, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for url, html in pages:
+            work(url, html)
+    elapsed = time.perf_counter() - started
+    return len(pages) * rounds / elapsed if elapsed else float('inf')
+
+def peak_memory_kb(pages, work):
+    """Average peak memory allocated while handling one page"""
+    peaks = []
+    for url, html in pages:
+        tracemalloc.start()
+        work(url, html)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+def learn_containers(pages):
+    """Detect each page's listing container once, as the selector memo would"""
+    plans = {}
+    for url, html in pages:
+        result = extract_page(html, url)
+        if result['plan']:
+            plans[url] = dict(result['plan'], **{'yield': len(result['listings'])})
+    return plans
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends on real pages')
+    parser.add_argument('--urls', type=str, help='Path to file containing URLs to download and benchmark (one per line)')
+    parser.add_argument('--pages', type=str, default='fixtures', help='Directory of saved .html pages (used without --urls)')
+    parser.add_argument('--rounds', type=int, default=20, help='Times each page is parsed per backend')
+    args = parser.parse_args()
+
+    pages = download_pages(load_urls_from_file(args.urls)) if args.urls else load_saved_pages(args.pages)
+    if not pages:
+        print("No pages to benchmark")
+        return
+
+    scraper = RealEstateScraper()
+    total_kb = sum(len(html.encode('utf-8')) for url, html in pages) / 1024
+    print(f"Benchmarking {len(pages)} pages ({total_kb:.0f} KB), {args.rounds} rounds each\n")
+    print(f"{'backend':<14}{'parse pages/s':>16}{'parse+extract pages/s':>24}")
+
+    for backend in available_backends():
+        scraper.parser_backend = backend
+        parse_rate = pages_per_second(pages, lambda url, html: make_soup(html, backend), args.rounds)
+        extract_rate = pages_per_second(pages, lambda url, html: scraper.parse_listings(html, URL(url)), args.rounds)
+        print(f"{backend:<14}{parse_rate:>16.1f}{extract_rate:>24.1f}")
+
+    # Partial parsing only applies once a page's listing container is known
+    plans = learn_containers(pages)
+    known = [(url, html) for url, html in pages if url in plans and container_strainer(plans[url]['container'])]
+    if not known:
+        return
+    print(f"\nFull vs partial (container-only) parsing on {len(known)} pages with a known container\n")
+    print(f"{'backend':<14}{'mode':<10}{'parse pages/s':>16}{'parse+extract pages/s':>24}{'peak KB/page':>15}")
+    for backend in available_backends():
+        for mode in ('full', 'partial'):
+            partial = mode == 'partial'
+
+            def parse(url, html):
+                strainer = container_strainer(plans[url]['container']) if partial else None
+                return make_soup(html, backend, strainer)
+
+            def extract(url, html):
+                return extract_page(html, url, backend, plans[url], partial=partial)
+
+            parse_rate = pages_per_second(known, parse, args.rounds)
+            extract_rate = pages_per_second(known, extract, args.rounds)
+            print(f"{backend:<14}{mode:<10}{parse_rate:>16.1f}{extract_rate:>24.1f}{peak_memory_kb(known, parse):>15.0f}")
+
+if __name__ == "__main__":
+    main()
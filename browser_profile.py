@@ -0,0 +1,131 @@
+import logging
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+# Resources a scrape never needs: images, media and fonts (matched by URL)
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp',
+    '*.mp4', '*.webm', '*.m3u8', '*.ts', '*.mp3', '*.ogg',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'
+]
+
+# Ad and analytics hosts seen on the sources we scrape
+TRACKER_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'adservice.google.com', 'hotjar.com', 'clarity.ms', 'taboola.com',
+    'outbrain.com', 'criteo.com', 'scorecardresearch.com', 'adnxs.com', 'yahoo.com/beacon'
+]
+
+# Resolves once the page stops changing for `quiet` ms, or after `timeout` ms
+DOM_SETTLED_SCRIPT = """
+const [quiet, timeout, done] = arguments;
+const started = Date.now();
+let finished = false, timer;
+const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(finish, quiet); });
+function finish() {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(deadline);
+    done(Date.now() - started);
+}
+const deadline = setTimeout(finish, timeout);
+observer.observe(document.documentElement, {childList: true, subtree: true});
+timer = setTimeout(finish, quiet);
+"""
+
+# Scrolls to the bottom and resolves true as soon as a node matching `selector` is
+# added (virtualized feeds swap nodes, so counts may not grow), or false after `timeout` ms
+SCROLL_FOR_NODES_SCRIPT = """
+const [selector, timeout, done] = arguments;
+let finished = false;
+const observer = new MutationObserver(mutations => {
+    for (const mutation of mutations) {
+        for (const node of mutation.addedNodes) {
+            if (node.nodeType === 1 && (node.matches(selector) || node.querySelector(selector))) {
+                return finish(true);
+            }
+        }
+    }
+});
+function finish(added) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(deadline);
+    done(added);
+}
+const deadline = setTimeout(() => finish(false), timeout);
+observer.observe(document.documentElement, {childList: true, subtree: true});
+window.scrollTo(0, document.body.scrollHeight);
+"""
+
+def blocked_url_patterns(settings=None):
+    """URL patterns the lean profile blocks, plus any `browser_blocked_domains` setting"""
+    settings = settings or {}
+    domains = TRACKER_DOMAINS + list(settings.get('browser_blocked_domains') or [])
+    return BLOCKED_RESOURCE_PATTERNS + [f'*{domain}*' for domain in domains]
+
+def chrome_options(user_agent=None, lean=True):
+    """Headless Chrome options; ``lean`` skips images, media and waiting for subresources"""
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')  # Run in headless mode
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    if user_agent:
+        options.add_argument(f'user-agent={user_agent}')
+
+    if lean:
+        # Hand the page over at DOMContentLoaded instead of waiting for every subresource
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--mute-audio')
+        options.add_argument('--autoplay-policy=user-gesture-required')
+        options.add_argument('--disable-extensions')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2
+        })
+    return options
+
+def block_resources(driver, patterns):
+    """Have Chrome fail requests for the given URL patterns before they are sent"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return True
+    except Exception as e:
+        logger.warning(f"Could not block resources, loading pages in full: {str(e)}")
+        return False
+
+def element_count(driver, selector):
+    return driver.execute_script('return document.querySelectorAll(arguments[0]).length', selector)
+
+def wait_for_dom_settled(driver, quiet=0.5, timeout=5):
+    """Wait until the DOM stops changing; returns the seconds waited"""
+    driver.set_script_timeout(timeout + 5)
+    try:
+        return driver.execute_async_script(DOM_SETTLED_SCRIPT, int(quiet * 1000), int(timeout * 1000)) / 1000
+    except Exception as e:
+        logger.debug(f"Error waiting for the page to settle: {str(e)}")
+        return timeout
+
+def scroll_for_more(driver, selector, timeout=10):
+    """Scroll to the bottom and wait for new ``selector`` elements to be added
+
+    Replaces a fixed pause after each scroll: a MutationObserver returns as
+    soon as a new item is added, or once ``timeout`` passes without one.
+    Returns whether anything was added.
+    """
+    driver.set_script_timeout(timeout + 5)
+    try:
+        added = driver.execute_async_script(SCROLL_FOR_NODES_SCRIPT, selector, int(timeout * 1000))
+    except Exception as e:
+        logger.debug(f"Error waiting for new items after scrolling: {str(e)}")
+        return False
+    if added:
+        # Items often arrive in a batch; let the rest of it render
+        wait_for_dom_settled(driver, quiet=0.3, timeout=2)
+    return bool(added)
@@ -26,6 +26,7 @@ class Config:
     
     # Scraping configuration
     SCRAPING_INTERVAL = int(os.environ.get('SCRAPING_INTERVAL', 3600))  # Default: 1 hour
+    CACHE_DIR = os.environ.get('CACHE_DIR', 'cache')  # Persistent scraper caches (HTTP validators etc.)
     KEYWORDS = os.environ.get('KEYWORDS', '').split(',')
     
     # Property scraping URLs
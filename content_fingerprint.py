@@ -0,0 +1,58 @@
+import hashlib
+import os
+import re
+from config import Config
+from json_store import JsonStore
+
+# Tokens that change on every request without the page content changing
+VOLATILE_PATTERNS = [
+    re.compile(r'<!--.*?-->', re.S),
+    # CSRF / anti-forgery tokens in meta tags and hidden inputs
+    re.compile(r'<meta[^>]+name=["\'](?:csrf[-_]?token|csrf[-_]?param|_token)["\'][^>]*>', re.I),
+    re.compile(r'<input[^>]+name=["\'](?:csrfmiddlewaretoken|_csrf|_token|authenticity_token|__RequestVerificationToken|__VIEWSTATE\w*|__EVENTVALIDATION)["\'][^>]*>', re.I),
+    # Token-like key/value pairs inside inline scripts and JSON
+    re.compile(r'(["\']?(?:csrf\w*|xsrf\w*|nonce|_token|token|requestId|request_id|traceId|buildId)["\']?\s*[:=]\s*)["\'][^"\']*["\']', re.I),
+    re.compile(r'\snonce=["\'][^"\']*["\']', re.I),
+    # Cache busters on asset URLs
+    re.compile(r'([?&](?:v|ver|_|ts|t|cb|cache|rev)=)[\w.-]+', re.I),
+    # Timestamps: ISO 8601, clock times, unix epochs (s and ms)
+    re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'),
+    re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?\b'),
+    re.compile(r'\b1[5-9]\d{8}(?:\d{3})?\b'),
+]
+
+def normalize_html(html):
+    """Strip volatile tokens and whitespace differences from a page"""
+    if not html:
+        return ""
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub(lambda m: m.group(1) if m.lastindex else '', html)
+    return re.sub(r'\s+', ' ', html).strip()
+
+def fingerprint(html):
+    """Return a stable hash of a page's normalized content"""
+    return hashlib.sha256(normalize_html(html).encode('utf-8', 'ignore')).hexdigest()
+
+class FingerprintStore:
+    """Per-URL content fingerprints from previous runs"""
+
+    def __init__(self, path=None):
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, 'fingerprints.json'))
+        self.unchanged = 0
+        self.changed = 0
+
+    def is_unchanged(self, url, html):
+        """Check a page against its last fingerprint and remember the new one"""
+        digest = fingerprint(html)
+        if self.store.get(url) == digest:
+            self.unchanged += 1
+            return True
+        self.store.set(url, digest)
+        self.changed += 1
+        return False
+
+    def forget(self, url):
+        self.store.delete(url)
+
+    def save(self):
+        return self.store.save()
@@ -0,0 +1,186 @@
+import logging
+import re
+import threading
+from urllib.parse import urlparse
+import soupsieve
+from yarl import URL
+from html_parser import make_soup, selector_strainer
+from listing_extractor import PRICE_PATTERN, absolute_url, clean_text, extract_from_soup, extract_page
+from structured_data import MIN_STRUCTURED_LISTINGS, extract_structured_listings
+from website_manager import normalize_host
+
+logger = logging.getLogger(__name__)
+
+# Per-site selectors that hold a listing field (see websites_config.yaml)
+FIELD_SELECTORS = ('title', 'price', 'size', 'location', 'property_type', 'description', 'link')
+
+NUMBER_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+SIZE_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(?:מ"ר|מ״ר|מטר|sqm|m2|m²)', re.I)
+
+def to_number(text):
+    return float(text.replace(',', '')) if text else None
+
+class ExtractionPlan:
+    """A configured site's selectors, compiled once and applied to its pages"""
+
+    def __init__(self, name, selectors):
+        self.name = name
+        self.listings = soupsieve.compile(selectors['listings'])
+        self.fields = {field: soupsieve.compile(selectors[field])
+                       for field in FIELD_SELECTORS if selectors.get(field)}
+
+    def _text(self, listing, field):
+        pattern = self.fields.get(field)
+        element = pattern.select_one(listing) if pattern else None
+        return clean_text(element.get_text(' ')) if element else None
+
+    def _price(self, listing):
+        text = self._text(listing, 'price')
+        if not text:
+            return None
+        match = PRICE_PATTERN.search(text)
+        if match:
+            return to_number(match.group(1) or match.group(2))
+        match = NUMBER_PATTERN.search(text)
+        return to_number(match.group()) if match else None
+
+    def _size(self, listing):
+        text = self._text(listing, 'size')
+        if not text:
+            return None
+        match = SIZE_PATTERN.search(text)
+        if match:
+            return to_number(match.group(1))
+        match = NUMBER_PATTERN.search(text)
+        return to_number(match.group()) if match else None
+
+    def _link(self, listing, page_url):
+        pattern = self.fields.get('link')
+        element = pattern.select_one(listing) if pattern else None
+        if element is None and listing.name == 'a':
+            element = listing
+        if element is not None and element.name != 'a':
+            element = element.find('a') or (element if element.get('href') else None)
+        if element is None:
+            element = listing.find('a')
+        return absolute_url(element.get('href') if element is not None else None, page_url)
+
+    def extract_listing(self, listing, page_url):
+        title = self._text(listing, 'title')
+        price = self._price(listing)
+        location = self._text(listing, 'location')
+        if not title or not (price or location):
+            return None
+        img = listing.find('img')
+        return {
+            'title': title,
+            'price': price,
+            'location': location or None,
+            'size': self._size(listing),
+            'property_type': self._text(listing, 'property_type') or None,
+            'description': self._text(listing, 'description') or None,
+            'url': self._link(listing, page_url),
+            'image_url': absolute_url(img.get('src') if img else None, page_url),
+            'source': page_url.host
+        }
+
+    def extract(self, soup, page_url):
+        """Extract the listings on a page of this site"""
+        properties = []
+        for listing in self.listings.select(soup):
+            try:
+                listing_data = self.extract_listing(listing, page_url)
+                if listing_data:
+                    properties.append(listing_data)
+            except Exception as e:
+                logger.error(f"Error parsing {self.name} listing: {str(e)}")
+                continue
+        return properties
+
+def plan_spec(name, config):
+    """The part of a site config a plan is compiled from (plain data, safe to send to workers)"""
+    selectors = config.get('selectors') or {}
+    return {'name': name, 'selectors': {key: selectors[key] for key in ('listings',) + FIELD_SELECTORS
+                                        if selectors.get(key)}}
+
+def site_plan_specs(site_configs):
+    """Plan specs keyed by host for every enabled site with usable selectors
+
+    Each spec is compiled here once, so a broken selector is reported at
+    start-up and that site falls back to the generic heuristics.
+    """
+    specs = {}
+    for name, config in site_configs.items():
+        spec = plan_spec(name, config)
+        if 'listings' not in spec['selectors'] or 'title' not in spec['selectors']:
+            continue
+        try:
+            get_plan(spec)
+        except Exception as e:
+            logger.error(f"Invalid selectors for {name}, using generic extraction: {str(e)}")
+            continue
+        specs[normalize_host(urlparse(config['base_url']).hostname)] = spec
+    return specs
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+def get_plan(spec):
+    """Compiled plan for a spec, compiled once per process"""
+    key = (spec['name'], tuple(sorted(spec['selectors'].items())))
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is None:
+            plan = _plans[key] = ExtractionPlan(spec['name'], spec['selectors'])
+        return plan
+
+def extract_site_page(html, page_url, parser_backend=None, spec=None, plan=None, min_yield=0.5, partial=False,
+                      structured=None):
+    """Extract a page's listings by the cheapest method that works
+
+    Listings embedded as JSON (JSON-LD, __NEXT_DATA__, app state) are read
+    straight from the raw HTML without building a DOM, when they form a
+    feed of at least MIN_STRUCTURED_LISTINGS. A single embedded item (often
+    a promoted one) is only used if the DOM yields no more. Otherwise
+    configured sites use their compiled plan, and everything else the
+    heuristics. Returns the same dict as listing_extractor.extract_page(),
+    plus ``method`` ('structured', 'site', 'memo' or 'detected') and
+    ``site_plan`` (the site name when its selectors were used). With
+    ``partial`` only the known listing containers are built, when the
+    container selector is simple enough for a SoupStrainer. ``structured``
+    is the site's `structured_data` config.
+    """
+    page_url = URL(str(page_url))
+    embedded = extract_structured_listings(html, page_url, structured)
+    structured_result = {'listings': embedded, 'plan': None, 'memo_hit': False, 'traversals': 0,
+                         'method': 'structured', 'site_plan': None}
+    if len(embedded) >= MIN_STRUCTURED_LISTINGS:
+        return structured_result
+
+    result = extract_dom_page(html, page_url, parser_backend, spec, plan, min_yield, partial)
+    if len(embedded) > len(result['listings']):
+        structured_result['traversals'] = result['traversals']
+        return structured_result
+    return result
+
+def extract_dom_page(html, page_url, parser_backend=None, spec=None, plan=None, min_yield=0.5, partial=False):
+    """Extract a page's listings from its DOM: the site's plan, or the heuristics"""
+    if not spec:
+        result = extract_page(html, page_url, parser_backend, plan, min_yield, partial)
+        result.update(method='memo' if result['memo_hit'] else 'detected', site_plan=None)
+        return result
+
+    strainer = selector_strainer(spec['selectors']['listings']) if partial else None
+    soup = make_soup(html, parser_backend, strainer)
+    listings = get_plan(spec).extract(soup, page_url)
+    if listings:
+        return {'listings': listings, 'plan': None, 'memo_hit': False, 'traversals': 1,
+                'method': 'site', 'site_plan': spec['name']}
+    logger.warning(f"Selectors for {spec['name']} matched no listings on {page_url}, using generic extraction")
+
+    if strainer:
+        soup = make_soup(html, parser_backend)
+    result = extract_from_soup(soup, page_url, plan, min_yield)
+    result['traversals'] += 1
+    result.update(method='memo' if result['memo_hit'] else 'detected', site_plan=None)
+    return result
@@ -0,0 +1,57 @@
+import re
+from functools import lru_cache
+
+# Marks that are dropped outright: niqqud and cantillation (the maqaf, paseq and
+# sof pasuq are punctuation and split words instead), bidi controls and zero-width
+# joiners, and the apostrophe/quote family, which writes geresh and gershayim
+# (נדל"ן, נדל''ן and נדל״ן all become one token)
+STRIPPED = re.compile(
+    '[\u0591-\u05bd\u05bf\u05c1\u05c2\u05c4\u05c5\u05c7'  # Niqqud and cantillation
+    '\u200b-\u200f\u202a-\u202e\u2066-\u2069\ufeff'  # Zero-width and bidi controls
+    '\'"`\u00b4\u05f3\u05f4\u2018-\u201f\u2032\u2033]'  # Apostrophes, quotes, geresh, gershayim
+)
+
+# Final forms are written as the regular letter, so a word matches wherever it ends
+FINAL_LETTERS = (('ם', 'מ'), ('ן', 'נ'), ('ץ', 'צ'), ('ף', 'פ'), ('ך', 'כ'))
+
+WORD = re.compile(r'\w+')
+
+# One-letter prefixes (and, the, in, to, from, that) that attach to the next word
+HEBREW_PREFIXES = 'הובלמש'
+MAX_PREFIX_LETTERS = 3
+
+# Fields whose token streams are cached on listing and news records
+TOKEN_FIELDS = ('title', 'description', 'location')
+
+def canonical(text):
+    """Text in canonical form: lower-case, no niqqud, bidi marks, quote marks or final letters"""
+    if not text:
+        return ''
+    text = STRIPPED.sub('', text.lower())
+    for final, regular in FINAL_LETTERS:
+        text = text.replace(final, regular)
+    return text
+
+@lru_cache(maxsize=4096)
+def tokenize(text):
+    """Canonical word tokens of a text; any punctuation, RTL or LTR, separates words"""
+    return tuple(WORD.findall(canonical(text))) if text else ()
+
+def normalize(text):
+    """Canonical text as single-spaced tokens, for comparing and de-duplicating"""
+    return ' '.join(tokenize(text))
+
+def record_tokens(record, *fields):
+    """Token stream of a record's fields, computed once and cached on the record
+
+    Listing and news dicts keep their streams under ``tokens`` while they
+    are classified and de-duplicated; the scrapers drop the key before the
+    records are returned or stored.
+    """
+    cache = record.setdefault('tokens', {})
+    tokens = []
+    for field in fields or TOKEN_FIELDS:
+        if field not in cache:
+            cache[field] = list(tokenize(record.get(field) or ''))
+        tokens.extend(cache[field])
+    return tokens
@@ -0,0 +1,153 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# The global slot held by the job running in the current task, if any
+_current_slot = contextvars.ContextVar('host_scheduler_slot', default=None)
+
+class _GlobalSlot:
+    """A job's share of the global concurrency budget, which it can hand back while idle"""
+
+    def __init__(self, scheduler, host):
+        self.scheduler = scheduler
+        self.host = host
+        self.held = False
+
+    async def acquire(self):
+        await self.scheduler._global.acquire()
+        self.held = True
+
+    def release(self):
+        if self.held:
+            self.held = False
+            self.scheduler._global.release()
+
+    async def pause(self, delay):
+        """Sleep without the slot, then wait for the host's turn and take a slot again"""
+        self.release()
+        await asyncio.sleep(delay)
+        await self.scheduler._wait_for_turn(self.host)
+        await self.acquire()
+
+async def backoff_sleep(delay):
+    """Sleep before a retry
+
+    Inside a HostScheduler job the global slot is given back for the
+    duration, so a host being retried does not hold up healthy ones. The
+    per-host slot is kept, so the host itself gets no extra requests.
+    """
+    slot = _current_slot.get()
+    if slot is None:
+        await asyncio.sleep(delay)
+    else:
+        await slot.pause(delay)
+
+class HostScheduler:
+    """Host-aware scheduler for polite concurrent fetching
+
+    Every job holds one slot of the global concurrency budget while it runs.
+    Jobs for the same host additionally share a per-host semaphore and are
+    spaced at least ``request_delay`` seconds apart. Jobs are queued in
+    round-robin order across hosts, so one busy host cannot starve the rest.
+    A job waiting to retry (``backoff_sleep``) gives its global slot back.
+    """
+
+    def __init__(self, max_concurrency=10, per_host_concurrency=2, request_delay=0):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self.request_delay = max(0.0, float(request_delay or 0))
+        self._loop = None
+        self._global = None
+        self._hosts = {}
+        self._next_slot = {}
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a scheduler from the `settings` section of websites_config.yaml"""
+        settings = settings or {}
+        return cls(
+            max_concurrency=settings.get('max_concurrency', 10),
+            per_host_concurrency=settings.get('per_host_concurrency', 2),
+            request_delay=settings.get('request_delay', 0)
+        )
+
+    @staticmethod
+    def host_of(url):
+        """Return the lower-cased host of a URL"""
+        return (urlparse(url).hostname or '').lower()
+
+    def interleave(self, urls):
+        """Order URLs round-robin across hosts, keeping per-host order"""
+        by_host = OrderedDict()
+        for url in urls:
+            by_host.setdefault(self.host_of(url), []).append(url)
+
+        ordered = []
+        queues = [list(reversed(host_urls)) for host_urls in by_host.values()]
+        while queues:
+            for queue in queues:
+                ordered.append(queue.pop())
+            queues = [queue for queue in queues if queue]
+        return ordered
+
+    def _host_semaphore(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._hosts[host]
+
+    async def _wait_for_turn(self, host):
+        """Sleep until the politeness delay for a host has elapsed"""
+        if not self.request_delay:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.request_delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _run_job(self, url, job):
+        host = self.host_of(url)
+        # Take the host slot first so jobs waiting on a busy host do not
+        # hold global slots that other hosts could use.
+        async with self._host_semaphore(host):
+            await self._wait_for_turn(host)
+            slot = _GlobalSlot(self, host)
+            await slot.acquire()
+            token = _current_slot.set(slot)
+            try:
+                return await job(url)
+            finally:
+                _current_slot.reset(token)
+                slot.release()
+
+    async def run(self, urls, job):
+        """Run ``job(url)`` for every URL and return results in input order"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphores are bound to the loop they were first used on
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._hosts = {}
+
+        tasks = {}
+        for url in self.interleave(urls):
+            if url not in tasks:
+                tasks[url] = asyncio.ensure_future(self._run_job(url, job))
+
+        if tasks:
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        results = []
+        for url in urls:
+            task = tasks[url]
+            if task.exception():
+                logger.error(f"Error processing {url}: {str(task.exception())}")
+                results.append(None)
+            else:
+                results.append(task.result())
+        return results
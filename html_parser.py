@@ -0,0 +1,75 @@
+import functools
+import importlib.util
+import logging
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup tree builders, fastest first. Each needs its module installed.
+BACKENDS = {
+    'lxml': 'lxml',
+    'html.parser': None,
+}
+
+@functools.lru_cache(maxsize=None)
+def is_available(backend):
+    """Whether a parser backend can be used in this environment"""
+    if backend not in BACKENDS:
+        return False
+    module = BACKENDS[backend]
+    return module is None or importlib.util.find_spec(module) is not None
+
+def available_backends():
+    """Installed parser backends, fastest first"""
+    return [backend for backend in BACKENDS if is_available(backend)]
+
+_warned = set()
+
+def resolve_backend(backend=None):
+    """Pick the parser to use: the one asked for if installed, else the fastest available
+
+    ``None`` or 'auto' means the fastest available. html.parser ships with
+    Python, so there is always something to fall back to.
+    """
+    if backend and backend != 'auto':
+        if is_available(backend):
+            return backend
+        if backend not in _warned:
+            _warned.add(backend)
+            logger.warning(f"HTML parser '{backend}' is not available, falling back to {available_backends()[0]}")
+    return available_backends()[0]
+
+def make_soup(html, backend=None, parse_only=None):
+    """Parse a page with the configured (or fastest available) backend"""
+    return BeautifulSoup(html or '', resolve_backend(backend), parse_only=parse_only)
+
+def has_class(class_name):
+    """Attribute matcher for a class, whether bs4 hands it over split or as the raw string"""
+    def matches(value):
+        if not value:
+            return False
+        return class_name in (value.split() if isinstance(value, str) else value)
+    return matches
+
+def class_strainer(name, class_name):
+    """A SoupStrainer for elements (of tag ``name``, if given) carrying a class"""
+    return SoupStrainer(name, {'class': has_class(class_name)})
+
+SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?(?:([.#])([\w-]+))?$')
+
+def selector_strainer(selector):
+    """A SoupStrainer for a simple selector (tag, .class, #id, tag.class), or None
+
+    Only the matching elements and their subtrees are built when a page is
+    parsed with it. Anything more complex returns None: parse the whole page.
+    """
+    match = SIMPLE_SELECTOR.match((selector or '').strip())
+    if not match or not (match.group(1) or match.group(3)):
+        return None
+    name, kind, value = match.groups()
+    if kind == '.':
+        return class_strainer(name, value)
+    if kind == '#':
+        return SoupStrainer(name, {'id': value})
+    return SoupStrainer(name)
@@ -0,0 +1,171 @@
+import asyncio
+import atexit
+import logging
+import threading
+import aiohttp
+from website_manager import WebsiteManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0'
+}
+
+class HttpClient:
+    """Long-lived pooled aiohttp client shared by all scrapers
+
+    Scheduled jobs should submit their coroutines through ``run()``. They then
+    execute on one background event loop whose session, connection pool and
+    DNS cache survive between runs. Coroutines running on any other loop
+    (Flask async views, ``asyncio.run`` in scripts) get a session of their own,
+    which ``release_session()`` closes at the end of the run.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.pool_size = int(settings.get('pool_size', 100))
+        self.per_host_connections = int(settings.get('per_host_connections', 4))
+        self.dns_cache_ttl = int(settings.get('dns_cache_ttl', 600))
+        self.keepalive_timeout = float(settings.get('keepalive_timeout', 120))
+
+        self.headers = dict(DEFAULT_HEADERS)
+        if settings.get('user_agent'):
+            self.headers['User-Agent'] = settings['user_agent']
+
+        self._sessions = {}
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._counters = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0
+        }
+
+    def _trace_config(self):
+        """Build trace hooks that feed the pool statistics"""
+        def counter(name):
+            async def increment(session, context, params):
+                self._counters[name] += 1
+            return increment
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(counter('requests'))
+        trace_config.on_connection_create_end.append(counter('connections_created'))
+        trace_config.on_connection_reuseconn.append(counter('connections_reused'))
+        trace_config.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        return trace_config
+
+    def _create_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.per_host_connections,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            trace_configs=[self._trace_config()]
+        )
+
+    async def get_session(self):
+        """Return the pooled session bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+        return session
+
+    async def release_session(self):
+        """Close the current loop's session unless it is the long-lived one"""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return self._loop
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever,
+                name='http-client-loop',
+                daemon=True
+            )
+            self._thread.start()
+            return self._loop
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the long-lived loop and wait for its result"""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("HttpClient.run() cannot be called from its own event loop")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return future.result(timeout)
+
+    def stats(self):
+        """Return connection pool statistics"""
+        stats = dict(self._counters)
+        connections = stats['connections_created'] + stats['connections_reused']
+        stats['reuse_ratio'] = round(stats['connections_reused'] / connections, 3) if connections else 0.0
+
+        open_connections = 0
+        for session in list(self._sessions.values()):
+            connector = session.connector
+            if session.closed or connector is None:
+                continue
+            idle = getattr(connector, '_conns', {})
+            open_connections += sum(len(conns) for conns in idle.values())
+            open_connections += len(getattr(connector, '_acquired', ()))
+        stats['open_connections'] = open_connections
+        stats['sessions'] = len(self._sessions)
+        return stats
+
+    async def _close_session(self, loop):
+        session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+
+    def close(self):
+        """Close the long-lived session and stop the background loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if not loop or not thread or not thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_session(loop), loop).result(10)
+        except Exception as e:
+            logger.error(f"Error closing HTTP client: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client(settings=None):
+    """Return the process-wide HTTP client, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if settings is None:
+                settings = WebsiteManager().get_settings()
+            _client = HttpClient(settings)
+            atexit.register(_client.close)
+        return _client
@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+def _lock_for(path):
+    with _file_locks_guard:
+        return _file_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+class JsonStore:
+    """Small persistent key/value store backed by a JSON file
+
+    Changes are kept in memory until ``save()``. On save, the file is
+    re-read and only the keys changed here are merged in, so two scrapers
+    sharing a file do not overwrite each other's entries.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        self._dirty = {}
+        self._deleted = set()
+        self.load()
+
+    def load(self):
+        """Load entries from disk"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading {self.path}: {str(e)}")
+            self.data = {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+        self._dirty[key] = value
+        self._deleted.discard(key)
+
+    def delete(self, key):
+        if key in self.data:
+            del self.data[key]
+        self._dirty.pop(key, None)
+        self._deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def save(self):
+        """Merge pending changes into the file on disk"""
+        if not self._dirty and not self._deleted:
+            return True
+        with _lock_for(self.path):
+            try:
+                on_disk = {}
+                if os.path.exists(self.path):
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        on_disk = json.load(f)
+                on_disk.update(self._dirty)
+                for key in self._deleted:
+                    on_disk.pop(key, None)
+
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(on_disk, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+
+                self.data = on_disk
+                self._dirty = {}
+                self._deleted = set()
+                return True
+            except Exception as e:
+                logger.error(f"Error saving {self.path}: {str(e)}")
+                return False
@@ -0,0 +1,176 @@
+import logging
+import os
+import re
+import threading
+from collections import deque
+from itertools import product
+from hebrew_text import HEBREW_PREFIXES, MAX_PREFIX_LETTERS, tokenize
+from website_manager import WebsiteManager
+
+logger = logging.getLogger(__name__)
+
+HEBREW_LETTER = re.compile(r'[א-ת]')
+
+def prefixed_forms(word):
+    """A word as it may appear in text: Hebrew words also with up to three prefix letters"""
+    forms = [word]
+    if HEBREW_LETTER.match(word):
+        for length in range(1, MAX_PREFIX_LETTERS + 1):
+            forms.extend(''.join(letters) + word for letters in product(HEBREW_PREFIXES, repeat=length))
+    return forms
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over word tokens
+
+    Keywords (single words or phrases) are compiled once into a trie of
+    words with failure links, so a text is matched against all of them in a
+    single pass over its tokens, whatever the number of keywords. Every
+    prefixed form of a Hebrew keyword word is mapped back to the word at
+    build time, so prefix handling costs one dict lookup per token.
+    """
+
+    def __init__(self, keywords):
+        self.forms = {}
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        for keyword, payload in keywords:
+            self._add(keyword, payload)
+        self._link()
+
+    def _add(self, keyword, payload):
+        words = tokenize(keyword)
+        if not words:
+            return
+        state = 0
+        for word in words:
+            for form in prefixed_forms(word):
+                # A real word wins over a prefixed reading of another one
+                if self.forms.get(form) != form:
+                    self.forms[form] = word
+            if word not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[state][word] = len(self.goto) - 1
+            state = self.goto[state][word]
+        # A keyword listed under several headings carries all of their payloads
+        for index, (known, payloads) in enumerate(self.outputs[state]):
+            if known == keyword:
+                self.outputs[state][index] = (keyword, payloads + (payload,))
+                return
+        self.outputs[state].append((keyword, (payload,)))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(word, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def matches(self, text=None, tokens=None):
+        """(keyword, payloads) for every keyword occurrence, in text order
+
+        Pass ``tokens`` (a hebrew_text token stream) to skip tokenizing again.
+        """
+        found = []
+        forms = self.forms
+        goto = self.goto
+        fail = self.fail
+        state = 0
+        for token in tokenize(text) if tokens is None else tokens:
+            word = forms.get(token)
+            if word is None:
+                state = 0
+                continue
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if self.outputs[state]:
+                found.extend(self.outputs[state])
+        return found
+
+class PropertyClassifier:
+    """Classifies listing and post text as commercial or residential, and by property type
+
+    Built from websites_config.yaml: `facebook_settings.commercial_keywords`
+    and `exclude_keywords`, and the `commercial_property_types` vocabularies.
+    """
+
+    def __init__(self, commercial_keywords=None, residential_keywords=None, property_types=None):
+        keywords = [(keyword, ('commercial', None)) for keyword in commercial_keywords or []]
+        keywords += [(keyword, ('residential', None)) for keyword in residential_keywords or []]
+        for name, vocabulary in (property_types or {}).items():
+            for language_keywords in (vocabulary or {}).values():
+                keywords += [(keyword, ('type', name)) for keyword in language_keywords or []]
+        self.automaton = KeywordAutomaton(keywords)
+
+    @classmethod
+    def from_config(cls, config):
+        config = config or {}
+        facebook_settings = config.get('facebook_settings') or {}
+        return cls(
+            commercial_keywords=facebook_settings.get('commercial_keywords'),
+            residential_keywords=facebook_settings.get('exclude_keywords'),
+            property_types=config.get('commercial_property_types')
+        )
+
+    def classify(self, text=None, tokens=None):
+        """Property type and commercial/residential category of a text or token stream
+
+        The property type is the most mentioned one (earliest on a tie).
+        The category is 'commercial', 'residential', 'mixed' when the text
+        has both kinds of keywords, or None.
+        """
+        type_counts = {}
+        commercial = residential = 0
+        keywords = []
+        for keyword, payloads in self.automaton.matches(text, tokens):
+            keywords.append(keyword)
+            kinds = {kind for kind, name in payloads}
+            if 'residential' in kinds:
+                residential += 1
+            if kinds - {'residential'}:
+                commercial += 1
+            for kind, name in payloads:
+                if kind == 'type':
+                    type_counts[name] = type_counts.get(name, 0) + 1
+
+        if commercial and residential:
+            category = 'mixed'
+        elif commercial:
+            category = 'commercial'
+        elif residential:
+            category = 'residential'
+        else:
+            category = None
+        property_type = max(type_counts, key=type_counts.get) if type_counts else None
+        return {'property_type': property_type, 'category': category, 'keywords': keywords}
+
+    def is_commercial(self, text):
+        return self.classify(text)['category'] == 'commercial'
+
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+def get_classifier(config_path='websites_config.yaml'):
+    """Classifier for a config file, rebuilt when the file changes"""
+    try:
+        version = os.stat(config_path).st_mtime_ns
+    except OSError:
+        version = None
+    with _classifiers_lock:
+        cached = _classifiers.get(config_path)
+        if cached and cached[0] == version:
+            return cached[1]
+        if cached:
+            logger.info(f"{config_path} changed, rebuilding keyword classifier")
+        classifier = PropertyClassifier.from_config(WebsiteManager(config_path).config)
+        _classifiers[config_path] = (version, classifier)
+        return classifier
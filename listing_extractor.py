@@ -0,0 +1,340 @@
+import asyncio
+import atexit
+import logging
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from yarl import URL
+from html_parser import class_strainer, make_soup
+
+logger = logging.getLogger(__name__)
+
+# Common property listing selectors, most specific first
+LISTING_SELECTORS = [
+    '.property-item', '.listing-item', '.real-estate-item',
+    '[class*="property"]', '[class*="listing"]', '[class*="apartment"]',
+    'article', '.card', '.item', '.feed-item', '.search-result'
+]
+
+# Amount before or after the currency symbol
+PRICE_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d{2})?)\s*[₪$€]|[$₪€]\s*(\d[\d,]*(?:\.\d{2})?)')
+
+def clean_text(text):
+    if not text:
+        return ""
+    return re.sub(r'\s+', ' ', text.strip())
+
+def extract_location(text):
+    if not text:
+        return None
+    # Remove common words and clean up
+    location = re.sub(r'(?i)(apartment|house|property|in|at|near|next to)', '', text)
+    return clean_text(location)
+
+def absolute_url(url, page_url):
+    """Make a listing's link or image URL absolute"""
+    if url and url.startswith('/'):
+        return f"https://{page_url.host}{url}"
+    if url and not url.startswith('http'):
+        return f"{page_url.scheme}://{page_url.host}/{url.lstrip('/')}"
+    return url
+
+def _compile_selectors(selectors):
+    """Split the listing selectors into class, class-substring and tag checks"""
+    classes, substrings, tags = {}, [], {}
+    for rank, selector in enumerate(selectors):
+        if selector.startswith('.'):
+            classes[selector[1:]] = rank
+        elif selector.startswith('[class*='):
+            substrings.append((selector.split('"')[1], rank))
+        else:
+            tags[selector] = rank
+    return classes, substrings, tags
+
+SELECTOR_CLASSES, SELECTOR_SUBSTRINGS, SELECTOR_TAGS = _compile_selectors(LISTING_SELECTORS)
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4']
+LOCATION_CLASS = re.compile(r'location|address')
+
+# Elements too small to be a listing container
+SKIP_TAGS = {
+    'html', 'head', 'body', 'script', 'style', 'meta', 'link', 'title', 'noscript', 'br', 'hr',
+    'a', 'img', 'span', 'b', 'i', 'em', 'strong', 'small', 'svg', 'path', 'input', 'button',
+    'option', 'label', 'source', 'picture', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'address'
+}
+
+def selector_rank(tag):
+    """Rank of the first listing selector an element matches, or None"""
+    classes = tag.get('class') or []
+    ranks = [SELECTOR_CLASSES[name] for name in classes if name in SELECTOR_CLASSES]
+    if classes:
+        joined = ' '.join(classes)
+        ranks.extend(rank for substring, rank in SELECTOR_SUBSTRINGS if substring in joined)
+    if tag.name in SELECTOR_TAGS:
+        ranks.append(SELECTOR_TAGS[tag.name])
+    return min(ranks) if ranks else None
+
+def listing_signals(element):
+    """Share of the listing signals (heading, link, price or location) an element has"""
+    has_heading = element.find(HEADING_TAGS) is not None
+    has_link = element.find('a') is not None
+    has_details = (element.find('address') is not None
+                   or element.find(class_=LOCATION_CLASS) is not None
+                   or PRICE_PATTERN.search(element.get_text()) is not None)
+    return (has_heading + has_link + has_details) / 3
+
+def detect_listing_groups(soup, sample_size=5):
+    """Find groups of repeated elements that look like listings, best first
+
+    One walk over the page groups elements that share a tag and first class
+    (a repeated structure) and notes the best listing selector each group
+    matches. Groups are then scored on a few sampled members: how many
+    listing signals they carry, how specific a selector they match, and how
+    many members there are.
+    """
+    groups = {}
+    for tag in soup.find_all(True):
+        if tag.name in SKIP_TAGS:
+            continue
+        classes = tag.get('class') or []
+        # Classed elements group page-wide, so stray nesting from broken markup
+        # does not split a list; unclassed ones only group with their siblings
+        key = (tag.name, classes[0]) if classes else (id(tag.parent), tag.name)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'members': [], 'rank': None}
+        group['members'].append(tag)
+        rank = selector_rank(tag)
+        if rank is not None and (group['rank'] is None or rank < group['rank']):
+            group['rank'] = rank
+
+    scored = []
+    for group in groups.values():
+        members = group['members']
+        # Unclassified elements only count when they repeat
+        if group['rank'] is None and len(members) < 3:
+            continue
+        sample = members[:sample_size]
+        quality = sum(listing_signals(member) for member in sample) / len(sample)
+        if not quality:
+            continue
+        specificity = 0 if group['rank'] is None else (len(LISTING_SELECTORS) - group['rank']) / len(LISTING_SELECTORS)
+        scored.append((quality * (1 + specificity) * math.log2(1 + min(len(members), 50)), members))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [(group_descriptor(members), members) for score, members in scored]
+
+def group_descriptor(members):
+    """Describe a group so it can be found again: tag and first class, or tag and parent"""
+    first = members[0]
+    classes = first.get('class') or []
+    if classes:
+        return {'name': first.name, 'class': classes[0]}
+    parent_classes = first.parent.get('class') or []
+    return {'name': first.name, 'parent': {'name': first.parent.name,
+                                           'class': parent_classes[0] if parent_classes else None}}
+
+def _first_class(tag):
+    classes = tag.get('class') or []
+    return classes[0] if classes else None
+
+def find_group(soup, container):
+    """Elements matching a remembered container, in one walk over the page"""
+    if container.get('class'):
+        return [tag for tag in soup.find_all(container['name']) if _first_class(tag) == container['class']]
+    parent = container.get('parent') or {}
+    return [tag for tag in soup.find_all(container['name'])
+            if not tag.get('class') and tag.parent is not None
+            and tag.parent.name == parent.get('name') and _first_class(tag.parent) == parent.get('class')]
+
+def extract_listing(listing, page_url, fields=None, found=None):
+    """Extract one listing's fields, or None if it lacks a title and a price or location
+
+    ``fields`` maps title/location to the tag that held them on this site
+    before; those are tried first. The tags actually used are written to
+    ``found``.
+    """
+    fields = fields or {}
+
+    # Extract title
+    title_elem = listing.find(fields['title']) if fields.get('title') else None
+    if title_elem is None:
+        title_elem = listing.find(['h1', 'h2', 'h3', 'h4', '.title', '[class*="title"]', '[class*="header"]'])
+    title = clean_text(title_elem.text) if title_elem else None
+
+    # Extract price
+    price_match = PRICE_PATTERN.search(listing.get_text())
+    price = float(re.sub(r'[^\d.]', '', price_match.group(1) or price_match.group(2))) if price_match else None
+
+    # Extract location
+    location_elem = listing.find(fields['location']) if fields.get('location') else None
+    if location_elem is None:
+        location_elem = listing.find(['address', '.location', '[class*="location"]', '[class*="address"]'])
+    location = extract_location(location_elem.text) if location_elem else None
+
+    # Extract URL and image
+    link = listing.find('a')
+    listing_url = absolute_url(link.get('href', '') if link else None, page_url)
+    img = listing.find('img')
+    image_url = absolute_url(img.get('src', '') if img else None, page_url)
+
+    # Only keep it if we have at least title and either price or location
+    if not (title and (price or location)):
+        return None
+    if found is not None:
+        found.setdefault('title', title_elem.name)
+        if location_elem is not None:
+            found.setdefault('location', location_elem.name)
+    return {
+        'title': title,
+        'price': price,
+        'location': location,
+        'url': listing_url,
+        'image_url': image_url,
+        'source': page_url.host
+    }
+
+def extract_group(listings, page_url, fields=None):
+    """Extract every listing in a group, returning (records, field tags used)"""
+    properties = []
+    found = {}
+    for listing in listings:
+        try:
+            listing_data = extract_listing(listing, page_url, fields, found)
+            if listing_data:
+                properties.append(listing_data)
+        except Exception as e:
+            logger.error(f"Error parsing listing: {str(e)}")
+            continue
+    return properties, found
+
+def container_strainer(container):
+    """A SoupStrainer that keeps only a remembered container (or its parent) and its subtree"""
+    if container.get('class'):
+        return class_strainer(container['name'], container['class'])
+    parent = container.get('parent') or {}
+    if parent.get('name') and parent.get('class'):
+        return class_strainer(parent['name'], parent['class'])
+    return None
+
+def extract_page(html, page_url, parser_backend=None, plan=None, min_yield=0.5, partial=False):
+    """Extract listings, trying a remembered container plan before full detection
+
+    ``plan`` is what worked on this host last time: ``{'container': ...,
+    'fields': ..., 'yield': ...}``. It is trusted while it still yields at
+    least ``min_yield`` of its usual listing count; otherwise the page goes
+    through detection and the better of the two wins. Returns a dict with
+    the listings, the plan to remember, whether the plan hit, and how many
+    walks over the whole page were needed.
+
+    With ``partial`` only the remembered container's subtrees are built;
+    the full page is parsed only if the plan no longer holds.
+    """
+    page_url = URL(str(page_url))
+    strainer = container_strainer(plan['container']) if plan and partial else None
+    if strainer:
+        soup = make_soup(html, parser_backend, strainer)
+        listings, found = extract_group(find_group(soup, plan['container']), page_url, plan.get('fields'))
+        if listings and len(listings) >= plan.get('yield', 0) * min_yield:
+            return {'listings': listings, 'plan': plan, 'memo_hit': True, 'traversals': 1}
+        result = extract_from_soup(make_soup(html, parser_backend), page_url, plan, min_yield)
+        result['traversals'] += 1
+        return result
+    return extract_from_soup(make_soup(html, parser_backend), page_url, plan, min_yield)
+
+def extract_from_soup(soup, page_url, plan=None, min_yield=0.5):
+    """extract_page() on an already parsed page"""
+    traversals = 0
+
+    remembered = []
+    if plan:
+        traversals += 1
+        remembered, found = extract_group(find_group(soup, plan['container']), page_url, plan.get('fields'))
+        if remembered and len(remembered) >= plan.get('yield', 0) * min_yield:
+            return {'listings': remembered, 'plan': plan, 'memo_hit': True, 'traversals': traversals}
+
+    traversals += 1
+    for descriptor, members in detect_listing_groups(soup):
+        properties, found = extract_group(members, page_url)
+        # Take the best-scoring group that actually yields listings
+        if properties:
+            if len(remembered) >= len(properties):
+                # The remembered container is still the best; this page just has fewer listings
+                break
+            return {'listings': properties, 'plan': {'container': descriptor, 'fields': found},
+                    'memo_hit': False, 'traversals': traversals}
+
+    return {'listings': remembered, 'plan': plan if remembered else None, 'memo_hit': False,
+            'traversals': traversals}
+
+def extract_listings(html, page_url, parser_backend=None):
+    """Extract property listings from a page's HTML as plain dicts
+
+    Module-level and free of scraper state so it can run in a worker
+    process; ``page_url`` may be a string or a yarl.URL.
+    """
+    return extract_page(html, page_url, parser_backend)['listings']
+
+class ParsePool:
+    """Process pool that parses pages off the event loop
+
+    Downloads keep flowing while pages are parsed on other cores. Workers
+    return plain listing dicts, never soup objects, so only the HTML goes in
+    and a few small records come back. With ``workers=0`` pages are parsed
+    inline, as before.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else max(0, int(workers))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawn rather than fork: the app runs a background event loop and scheduler threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    async def run(self, func, *args):
+        """Run a module-level parse function in a worker process"""
+        if not self.workers:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            logger.error("Parse worker died, restarting the pool and parsing this page inline")
+            self.shutdown()
+            return func(*args)
+
+    async def extract(self, html, page_url, parser_backend=None):
+        """Extract listings from a page in a worker process"""
+        return await self.run(extract_listings, html, str(page_url), parser_backend)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_parse_pool(settings=None):
+    """Return the process-wide parse pool, sized by `parse_workers` (0 parses inline)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            settings = settings or {}
+            _pool = ParsePool(settings.get('parse_workers'))
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -2,18 +2,27 @@ import yaml
 import logging
 from datetime import datetime
 import os
+import threading
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from scrapers.facebook_scraper import FacebookScraper
 from scrapers.yad2_scraper import Yad2Scraper
 from processors.data_processor import CommercialPropertyProcessor
+from browser_profile import block_resources, blocked_url_patterns, chrome_options
+from keyword_matcher import get_classifier
+from proxy_pool import get_proxy_pool, chrome_proxy_argument
+from scroll_harvester import POST_SELECTOR, ScrollHarvester, SeenPosts, post_listing
+from webdriver_pool import get_webdriver_pool
+from yad2_http import Yad2HttpScraper
 
 class RealEstateOrchestrator:
     def __init__(self):
         self.setup_logging()
         self.load_config()
         self.setup_processor()
+        self.setup_driver_pool()
+        self.seen_posts = SeenPosts()
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -38,17 +47,48 @@ class RealEstateOrchestrator:
         """Setup data processor"""
         self.processor = CommercialPropertyProcessor()
 
+    def setup_driver_pool(self):
+        """Share warm browser sessions between runs instead of starting Chrome per source"""
+        self.driver_path = None
+        self.driver_path_lock = threading.Lock()
+        # Resolve chromedriver before the pool starts browsers in parallel
+        try:
+            self.chromedriver_path()
+        except Exception as e:
+            self.logger.error(f"Error resolving chromedriver: {str(e)}")
+        self.driver_pool = get_webdriver_pool(self.setup_webdriver, self.config['settings'])
+
+    def chromedriver_path(self):
+        """Resolve (and download, if needed) chromedriver once, not per browser"""
+        with self.driver_path_lock:
+            if not self.driver_path:
+                self.driver_path = ChromeDriverManager().install()
+            return self.driver_path
+
     def setup_webdriver(self):
         """Setup Selenium WebDriver"""
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument('--headless')  # Run in headless mode
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument(f'user-agent={self.config["settings"]["user_agent"]}')
+            settings = self.config['settings']
+            # The lean profile skips images, media, fonts and trackers the scrapers never read
+            lean = settings.get('lean_browser', True)
+            options = chrome_options(settings['user_agent'], lean)
             
-            service = Service(ChromeDriverManager().install())
+            # Route the browser through the shared proxy pool when proxies are enabled
+            proxy_pool = get_proxy_pool(self.config.get('proxy_settings'))
+            proxy = proxy_pool.acquire() if proxy_pool else None
+            proxy_argument = chrome_proxy_argument(proxy) if proxy else None
+            if proxy_argument:
+                options.add_argument(proxy_argument)
+                self.logger.info(f"WebDriver using proxy {proxy}")
+            elif proxy:
+                parts = urlparse(proxy)
+                self.logger.warning(f"Proxy {parts.hostname}:{parts.port} needs credentials, which Chrome "
+                                    f"cannot take on the command line; WebDriver connecting directly")
+            
+            service = Service(self.chromedriver_path())
             driver = webdriver.Chrome(service=service, options=options)
+            if lean:
+                block_resources(driver, blocked_url_patterns(settings))
             
             return driver
         except Exception as e:
@@ -58,37 +98,47 @@ class RealEstateOrchestrator:
     def scrape_facebook_groups(self):
         """Scrape Facebook groups"""
         try:
-            driver = self.setup_webdriver()
-            scraper = FacebookScraper(driver)
-            
-            all_properties = []
             groups_config = self.config['facebook_groups']
-            
-            # Scrape default groups
-            for group in groups_config['groups']:
-                try:
-                    properties = scraper.scrape_group(
-                        group['url'],
-                        self.config['facebook_settings']['max_posts_per_group']
-                    )
-                    all_properties.extend(properties)
-                    self.logger.info(f"Scraped {len(properties)} properties from {group['name']}")
-                except Exception as e:
-                    self.logger.error(f"Error scraping group {group['name']}: {str(e)}")
-            
-            # Scrape custom groups
-            for group in groups_config.get('custom_groups', []):
-                try:
-                    properties = scraper.scrape_group(
-                        group['url'],
-                        self.config['facebook_settings']['max_posts_per_group']
-                    )
-                    all_properties.extend(properties)
-                    self.logger.info(f"Scraped {len(properties)} properties from {group['name']}")
-                except Exception as e:
-                    self.logger.error(f"Error scraping custom group {group['name']}: {str(e)}")
-            
-            driver.quit()
+            facebook_settings = self.config['facebook_settings']
+            groups = list(groups_config['groups']) + list(groups_config.get('custom_groups') or [])
+            max_posts = facebook_settings['max_posts_per_group']
+            classifier = get_classifier()
+
+            def scrape_group(driver, group):
+                # Scrolls only until it reaches posts ingested on an earlier run
+                harvester = ScrollHarvester(
+                    driver, facebook_settings.get('post_selector', POST_SELECTOR), self.seen_posts,
+                    max_posts=max_posts, scroll_timeout=facebook_settings.get('scroll_pause_time', 2)
+                )
+                posts = harvester.harvest(group['url'], group['url'], record=False)
+                properties = [listing for listing in (post_listing(post_id, html, group, classifier)
+                                                      for post_id, html in posts) if listing]
+                self.logger.info(f"Scraped {len(properties)} properties from {len(posts)} new posts "
+                                 f"in {group['name']}")
+                return [post_id for post_id, html in posts], properties
+
+            # Groups are spread over the pooled browsers, each with its own deadline
+            results = self.driver_pool.map(
+                scrape_group, groups,
+                workers=facebook_settings.get('max_parallel_groups'),
+                deadline=facebook_settings.get('group_deadline'),
+                label=lambda group: f"Group {group['name']}"
+            )
+
+            all_properties = []
+            seen = set()
+            for group, result in zip(groups, results):
+                if result is None:
+                    continue
+                post_ids, properties = result
+                # Groups that failed or ran past their deadline keep their posts for next time
+                self.seen_posts.add(group['url'], post_ids)
+                for prop in properties:
+                    url = prop.get('url') if isinstance(prop, dict) else None
+                    if url and url in seen:
+                        continue
+                    seen.add(url)
+                    all_properties.append(prop)
             return all_properties
             
         except Exception as e:
@@ -97,14 +147,21 @@ class RealEstateOrchestrator:
 
     def scrape_yad2(self):
         """Scrape Yad2"""
+        # Read over plain HTTP; a browser session is only an opt-in fallback
+        site_config = self.config['websites'].get('yad2_commercial')
+        settings = self.config['settings']
+        if site_config:
+            properties = Yad2HttpScraper(site_config, settings).scrape()
+            if properties or not settings.get('yad2_selenium_fallback', False):
+                return properties
+            self.logger.info("No Yad2 listings over HTTP, falling back to Selenium")
+
         try:
-            driver = self.setup_webdriver()
-            scraper = Yad2Scraper(driver)
-            
-            properties = scraper.scrape_listings()
+            with self.driver_pool.driver() as driver:
+                scraper = Yad2Scraper(driver)
+                properties = scraper.scrape_listings()
             self.logger.info(f"Scraped {len(properties)} properties from Yad2")
             
-            driver.quit()
             return properties
             
         except Exception as e:
@@ -121,6 +178,8 @@ class RealEstateOrchestrator:
             if fb_properties:
                 df = self.processor.process_properties(fb_properties)
                 self.processor.save_data(df, 'facebook')
+            # Posts only count as seen once what they yielded is stored
+            self.seen_posts.save()
             
             # Scrape Yad2
             yad2_properties = self.scrape_yad2()
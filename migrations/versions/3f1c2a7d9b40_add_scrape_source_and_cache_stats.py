@@ -0,0 +1,51 @@
+"""Add listing url/source and scrape job/cache stats columns
+
+Revision ID: 3f1c2a7d9b40
+Revises:
+Create Date: 2025-01-20 10:00:00.000000
+
+Databases created by ``db.create_all()`` after these columns were added
+already have them, so only the missing ones are added.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = {
+    'properties': [
+        sa.Column('url', sa.String(length=1000), nullable=True),
+        sa.Column('source', sa.String(length=100), nullable=True),
+    ],
+    'scraping_logs': [
+        sa.Column('job', sa.String(length=50), nullable=True),
+        sa.Column('cache_hits', sa.Integer(), nullable=True),
+        sa.Column('cache_misses', sa.Integer(), nullable=True),
+    ],
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in NEW_COLUMNS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+
+    indexes = {index['name'] for index in inspector.get_indexes('properties')}
+    if 'ix_properties_url' not in indexes:
+        op.create_index('ix_properties_url', 'properties', ['url'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_properties_url', table_name='properties')
+    for table, columns in NEW_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.drop_column(column.name)
@@ -57,6 +57,8 @@ class Property(db.Model):
     date_listed = db.Column(db.DateTime, default=datetime.utcnow)
     date_scraped = db.Column(db.DateTime, default=datetime.utcnow)  # Added the missing field
     image_url = db.Column(db.String(1000))
+    url = db.Column(db.String(1000), index=True)
+    source = db.Column(db.String(100))
 
     def __repr__(self):
         return f'<Property {self.title}>'
@@ -71,18 +73,23 @@ class Property(db.Model):
             'property_type': self.property_type,
             'date_listed': self.date_listed.isoformat() if self.date_listed else None,
             'date_scraped': self.date_scraped.isoformat() if self.date_scraped else None,  # Include date_scraped
-            'image_url': self.image_url
+            'image_url': self.image_url,
+            'url': self.url,
+            'source': self.source
         }
 
 class ScrapingLog(db.Model):
     __tablename__ = 'scraping_logs'
 
     id = db.Column(db.Integer, primary_key=True)
+    job = db.Column(db.String(50))  # 'properties' or 'news'
     start_time = db.Column(db.DateTime, default=datetime.utcnow)
     end_time = db.Column(db.DateTime)
     status = db.Column(db.String(50))
     items_scraped = db.Column(db.Integer, default=0)
     items_new = db.Column(db.Integer, default=0)
+    cache_hits = db.Column(db.Integer, default=0)  # Pages answered with 304 Not Modified
+    cache_misses = db.Column(db.Integer, default=0)  # Pages downloaded in full
     error_message = db.Column(db.Text)
 
     def __repr__(self):
@@ -91,10 +98,13 @@ class ScrapingLog(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'job': self.job,
             'start_time': self.start_time.isoformat(),
             'end_time': self.end_time.isoformat() if self.end_time else None,
             'status': self.status,
             'items_scraped': self.items_scraped,
             'items_new': self.items_new,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
             'error_message': self.error_message
         }
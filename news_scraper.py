@@ -1,33 +1,44 @@
-import aiohttp
+import asyncio
 import logging
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 import re
 from datetime import datetime
-from models import db, News
+from models import db, News, ScrapingLog
+from hebrew_text import record_tokens
+from host_scheduler import HostScheduler
+from http_client import get_http_client
+from page_fetcher import PageFetcher
+from content_fingerprint import FingerprintStore
+from validator_cache import ValidatorCache
+from website_manager import WebsiteManager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class NewsScraperService:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.session = None
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0'
-        }
+        self.website_manager = WebsiteManager()
+        self.settings = settings if settings is not None else self.website_manager.get_settings()
+        self.http_client = get_http_client(self.settings)
+        self.scheduler = HostScheduler.from_settings(self.settings)
+        self.deadline = self.settings.get('news_deadline', 60)
+        self.fetcher = PageFetcher.from_settings(
+            self.settings,
+            ValidatorCache(),
+            proxy_settings=self.website_manager.get_proxy_settings()
+        )
+        self.fingerprints = FingerprintStore()
+        self.parser_backend = self.settings.get('html_parser', 'auto')
 
     async def create_session(self):
         if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
+            self.session = await self.http_client.get_session()
         return self.session
 
     async def close_session(self):
         if self.session:
-            await self.session.close()
+            await self.http_client.release_session()
             self.session = None
 
     def clean_text(self, text):
@@ -35,104 +46,162 @@ class NewsScraperService:
             return ""
         return re.sub(r'\s+', ' ', text.strip())
 
+    async def fetch_page(self, url):
+        """Fetch one news page, or None if it failed or has not changed"""
+        session = await self.create_session()
+        response = await self.fetcher.fetch(session, url)
+        if not response.ok:
+            # Failed, or unchanged since the last run (304): nothing to parse
+            return None
+        if self.fingerprints.is_unchanged(url, response.text):
+            logger.info(f"Content unchanged since last run: {url}")
+            return None
+        return response
+
+    async def fetch_pages(self, urls):
+        """Fetch news pages concurrently, giving up on stragglers at the run deadline"""
+        pages = {}
+
+        async def fetch(url):
+            pages[url] = await self.fetch_page(url)
+
+        try:
+            await asyncio.wait_for(self.scheduler.run(urls, fetch), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            missing = [url for url in urls if url not in pages]
+            logger.warning(f"News run deadline of {self.deadline}s reached, skipping: {', '.join(missing)}")
+        return pages
+
+    def parse_articles(self, html, page_url):
+        """Extract news articles from one source's page"""
+        soup = make_soup(html, self.parser_backend)
+        articles_found = []
+        
+        # Common article selectors
+        selectors = [
+            'article', '.article', '.post',
+            '[class*="article"]', '[class*="post"]', '[class*="news"]',
+            '.story', '.entry', '.item'
+        ]
+        
+        for selector in selectors:
+            articles = soup.select(selector)
+            if articles:
+                for article in articles:
+                    try:
+                        # Extract title
+                        title_elem = article.find(['h1', 'h2', 'h3', 'h4', '.title', '[class*="title"]', '[class*="headline"]'])
+                        title = self.clean_text(title_elem.text) if title_elem else None
+                        
+                        # Extract description
+                        desc_elem = article.find(['p', '.description', '[class*="description"]', '[class*="summary"]', '[class*="excerpt"]'])
+                        description = self.clean_text(desc_elem.text) if desc_elem else None
+                        
+                        # Extract URL
+                        link = article.find('a')
+                        article_url = link.get('href', '') if link else None
+                        
+                        # Make URL absolute if it's relative
+                        if article_url and article_url.startswith('/'):
+                            article_url = f"https://{page_url.host}{article_url}"
+                        elif article_url and not article_url.startswith('http'):
+                            article_url = f"{page_url.scheme}://{page_url.host}/{article_url.lstrip('/')}"
+                        
+                        # Extract image
+                        img = article.find('img')
+                        image_url = img.get('src', '') if img else None
+                        
+                        # Make image URL absolute if it's relative
+                        if image_url and image_url.startswith('/'):
+                            image_url = f"https://{page_url.host}{image_url}"
+                        elif image_url and not image_url.startswith('http'):
+                            image_url = f"{page_url.scheme}://{page_url.host}/{image_url.lstrip('/')}"
+                        
+                        # Only add if we have at least a title
+                        if title:
+                            articles_found.append({
+                                'title': title,
+                                'description': description,
+                                'url': article_url,
+                                'image_url': image_url,
+                                'source': page_url.host
+                            })
+                    
+                    except Exception as e:
+                        logger.error(f"Error parsing news article: {str(e)}")
+                        continue
+                
+                # If this source yielded articles with this selector, no need to try others
+                if articles_found:
+                    break
+        
+        return articles_found
+
     async def scrape_news(self, urls):
-        """Scrape news from multiple URLs"""
+        """Scrape news from multiple URLs concurrently"""
+        start_time = datetime.utcnow()
         try:
-            all_news = []
-            session = await self.create_session()
+            pages = await self.fetch_pages(urls)
 
+            all_news = []
+            seen_titles = set()
+            new_count = 0
             for url in urls:
+                response = pages.get(url)
+                if not response:
+                    continue
                 try:
-                    async with session.get(url, timeout=30) as response:
-                        if response.status != 200:
-                            logger.error(f"Failed to fetch {url}: {response.status}")
+                    for news_item in self.parse_articles(response.text, response.url):
+                        # Check if this news item is unique; titles differing only in niqqud,
+                        # quote marks or punctuation are the same story
+                        title = tuple(record_tokens(news_item, 'title'))
+                        news_item.pop('tokens', None)
+                        if title in seen_titles:
                             continue
+                        seen_titles.add(title)
+                        all_news.append(news_item)
 
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Common article selectors
-                        selectors = [
-                            'article', '.article', '.post',
-                            '[class*="article"]', '[class*="post"]', '[class*="news"]',
-                            '.story', '.entry', '.item'
-                        ]
-                        
-                        for selector in selectors:
-                            articles = soup.select(selector)
-                            if articles:
-                                for article in articles:
-                                    try:
-                                        # Extract title
-                                        title_elem = article.find(['h1', 'h2', 'h3', 'h4', '.title', '[class*="title"]', '[class*="headline"]'])
-                                        title = self.clean_text(title_elem.text) if title_elem else None
-                                        
-                                        # Extract description
-                                        desc_elem = article.find(['p', '.description', '[class*="description"]', '[class*="summary"]', '[class*="excerpt"]'])
-                                        description = self.clean_text(desc_elem.text) if desc_elem else None
-                                        
-                                        # Extract URL
-                                        link = article.find('a')
-                                        article_url = link.get('href', '') if link else None
-                                        
-                                        # Make URL absolute if it's relative
-                                        if article_url and article_url.startswith('/'):
-                                            article_url = f"https://{response.url.host}{article_url}"
-                                        elif article_url and not article_url.startswith('http'):
-                                            article_url = f"{response.url.scheme}://{response.url.host}/{article_url.lstrip('/')}"
-                                        
-                                        # Extract image
-                                        img = article.find('img')
-                                        image_url = img.get('src', '') if img else None
-                                        
-                                        # Make image URL absolute if it's relative
-                                        if image_url and image_url.startswith('/'):
-                                            image_url = f"https://{response.url.host}{image_url}"
-                                        elif image_url and not image_url.startswith('http'):
-                                            image_url = f"{response.url.scheme}://{response.url.host}/{image_url.lstrip('/')}"
-                                        
-                                        # Only add if we have at least a title
-                                        if title:
-                                            news_item = {
-                                                'title': title,
-                                                'description': description,
-                                                'url': article_url,
-                                                'image_url': image_url,
-                                                'source': response.url.host
-                                            }
-                                            
-                                            # Check if this news item is unique
-                                            if not any(n['title'] == title for n in all_news):
-                                                all_news.append(news_item)
-                                                
-                                                # Save to database
-                                                existing = News.query.filter_by(url=article_url).first() if article_url else None
-                                                if not existing:
-                                                    new_news = News(
-                                                        title=title,
-                                                        description=description,
-                                                        url=article_url,
-                                                        image_url=image_url,
-                                                        source=response.url.host,
-                                                        date_scraped=datetime.utcnow()
-                                                    )
-                                                    db.session.add(new_news)
-                                    
-                                    except Exception as e:
-                                        logger.error(f"Error parsing news article: {str(e)}")
-                                        continue
-                                
-                                # If we found articles using this selector, no need to try others
-                                if all_news:
-                                    break
+                        # Save to database
+                        existing = News.query.filter_by(url=news_item['url']).first() if news_item['url'] else None
+                        if not existing:
+                            db.session.add(News(
+                                title=news_item['title'],
+                                description=news_item['description'],
+                                url=news_item['url'],
+                                image_url=news_item['image_url'],
+                                source=news_item['source'],
+                                date_scraped=datetime.utcnow()
+                            ))
+                            new_count += 1
                 
                 except Exception as e:
                     logger.error(f"Error scraping news from {url}: {str(e)}")
+                    # The page was not parsed, so it must not count as seen on the next run
+                    self.fetcher.forget(url)
+                    self.fingerprints.forget(url)
                     continue
 
+            # Log the scraping
+            cache_stats = self.fetcher.stats()
+            db.session.add(ScrapingLog(
+                job='news',
+                start_time=start_time,
+                end_time=datetime.utcnow(),
+                status='success',
+                items_scraped=len(all_news),
+                items_new=new_count,
+                cache_hits=cache_stats['cache_hits'],
+                cache_misses=cache_stats['cache_misses']
+            ))
+
             # Commit all changes to database
             db.session.commit()
-            logger.info(f"Scraped {len(all_news)} unique news articles")
+            # Only remember validators and fingerprints once the pages they describe are stored
+            self.fetcher.save()
+            self.fingerprints.save()
+            logger.info(f"Scraped {len(all_news)} unique news articles "
+                        f"(cache hits: {cache_stats['cache_hits']}, misses: {cache_stats['cache_misses']}, "
+                        f"unchanged pages skipped: {self.fingerprints.unchanged})")
             return all_news
 
         except Exception as e:
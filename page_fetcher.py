@@ -0,0 +1,232 @@
+import asyncio
+import codecs
+import logging
+import re
+import time
+from urllib.parse import urlparse
+import aiohttp
+from yarl import URL
+from host_scheduler import backoff_sleep
+from proxy_pool import PROXY_ERROR_STATUSES, get_proxy_pool
+from retry_policy import RetryPolicy, get_circuit_breaker, parse_retry_after
+from website_manager import normalize_host
+
+logger = logging.getLogger(__name__)
+
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+def is_text_content_type(content_type):
+    """Whether a media type is something we can parse as a page"""
+    content_type = (content_type or '').lower()
+    return (content_type.startswith('text/')
+            or content_type in ('application/xhtml+xml', 'application/xml', 'application/json')
+            or content_type.endswith('+xml') or content_type.endswith('+json'))
+
+def detect_encoding(response, body):
+    """Pick the body encoding from the headers, then a <meta charset>, then UTF-8"""
+    if response.charset:
+        return response.charset
+    match = META_CHARSET.search(body[:4096])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+class FetchResult:
+    """Outcome of fetching one page"""
+
+    def __init__(self, url, status, text=None, headers=None, not_modified=False, error=None):
+        self.url = url  # Final URL after redirects (yarl.URL)
+        self.status = status
+        self.text = text
+        self.headers = headers or {}
+        self.not_modified = not_modified
+        self.error = error
+        self.stopped_early = False  # Stopped at the source's stream_stop_marker
+        self.truncated = False  # Hit the byte ceiling
+
+    @property
+    def ok(self):
+        return self.status == 200 and self.text is not None
+
+class PageFetcher:
+    """Fetches pages with conditional requests, retries and a per-host circuit breaker"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, validator_cache=None, timeout=30, connect_timeout=10,
+                 retry_policy=None, circuit_breaker=None, max_page_bytes=None, site_configs=None,
+                 proxy_pool=None):
+        self.validator_cache = validator_cache
+        self.proxy_pool = proxy_pool
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=0)
+        self.circuit_breaker = circuit_breaker
+        self.max_page_bytes = max_page_bytes
+        self.site_limits = {}
+        for config in (site_configs or {}).values():
+            limits = {key: config[key] for key in ('max_page_bytes', 'stream_stop_marker') if config.get(key)}
+            if limits:
+                self.site_limits[normalize_host(urlparse(config['base_url']).hostname)] = limits
+
+    @classmethod
+    def from_settings(cls, settings, validator_cache=None, site_configs=None, proxy_settings=None):
+        """Create a fetcher from the `settings` (and `proxy_settings`) sections of websites_config.yaml"""
+        settings = settings or {}
+        return cls(
+            validator_cache=validator_cache,
+            timeout=settings.get('timeout', 30),
+            connect_timeout=settings.get('connect_timeout', 10),
+            retry_policy=RetryPolicy.from_settings(settings),
+            circuit_breaker=get_circuit_breaker(settings),
+            max_page_bytes=settings.get('max_page_bytes'),
+            site_configs=site_configs,
+            proxy_pool=get_proxy_pool(proxy_settings)
+        )
+
+    async def fetch(self, session, url):
+        """Fetch a page, returning a FetchResult with ``not_modified`` set on 304"""
+        host = urlparse(url).hostname or ''
+        breaker = self.circuit_breaker
+        if breaker and not breaker.allow(host):
+            logger.warning(f"Circuit open for {host}, skipping {url}")
+            return FetchResult(URL(url), None, error='circuit open')
+
+        # A half-open probe gets a single attempt
+        probing = breaker.is_probing(host) if breaker else False
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                result = await self._fetch_once(session, url)
+                error = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result = None
+                error = str(e) or e.__class__.__name__
+
+            if result is not None and not self.retry_policy.is_retryable(result.status):
+                if breaker:
+                    breaker.record_success(host)
+                return result
+
+            if result is not None:
+                error = f"HTTP {result.status}"
+                retry_after = parse_retry_after(result.headers.get('Retry-After'))
+            if breaker:
+                breaker.record_failure(host)
+
+            delay = None if probing else self.retry_policy.delay(attempt, retry_after)
+            if delay is None or (breaker and not breaker.allow(host)):
+                logger.error(f"Failed to fetch {url} after {attempt + 1} attempt(s): {error}")
+                return result or FetchResult(URL(url), None, error=error)
+
+            attempt += 1
+            logger.info(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 1}, {error})")
+            # Other hosts get this request's concurrency slot while we wait
+            await backoff_sleep(delay)
+
+    async def _fetch_once(self, session, url):
+        proxy = self.proxy_pool.acquire() if self.proxy_pool else None
+        started = time.monotonic()
+        try:
+            result = await self._request(session, url, proxy)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if proxy:
+                self.proxy_pool.report(proxy, ok=False)
+            raise
+        if proxy:
+            self.proxy_pool.report(proxy, time.monotonic() - started,
+                                   ok=result.status not in PROXY_ERROR_STATUSES)
+        return result
+
+    async def _request(self, session, url, proxy=None):
+        headers = self.validator_cache.conditional_headers(url) if self.validator_cache else {}
+
+        async with session.get(url, timeout=self.timeout, headers=headers, proxy=proxy) as response:
+            if response.status == 304:
+                if self.validator_cache:
+                    self.validator_cache.record_not_modified(url)
+                logger.info(f"Not modified since last run: {url}")
+                return FetchResult(response.url, 304, not_modified=True)
+
+            if response.status != 200:
+                if not self.retry_policy.is_retryable(response.status):
+                    logger.error(f"Failed to fetch {url}: {response.status}")
+                return FetchResult(response.url, response.status, headers=dict(response.headers))
+
+            max_bytes, stop_marker = self.limits_for(url)
+            rejection = self._check_headers(response)
+            if rejection:
+                logger.warning(f"Skipping {url}: {rejection}")
+                return FetchResult(response.url, 200, headers=dict(response.headers), error=rejection)
+
+            body, stopped_early, truncated, rejection = await self._read_body(response, max_bytes, stop_marker)
+            if rejection:
+                logger.warning(f"Skipping {url}: {rejection}")
+                return FetchResult(response.url, 200, headers=dict(response.headers), error=rejection)
+            if truncated:
+                logger.warning(f"Truncated {url} at {max_bytes} bytes")
+            elif self.validator_cache:
+                self.validator_cache.record_response(url, response.headers)
+
+            text = body.decode(detect_encoding(response, body), errors='replace')
+            result = FetchResult(response.url, 200, text=text, headers=dict(response.headers))
+            result.stopped_early = stopped_early
+            result.truncated = truncated
+            return result
+
+    def limits_for(self, url):
+        """Byte ceiling and stop marker for the source a URL belongs to"""
+        site = self.site_limits.get(normalize_host(urlparse(url).hostname), {})
+        return site.get('max_page_bytes', self.max_page_bytes), site.get('stream_stop_marker')
+
+    def _check_headers(self, response):
+        """Reject responses that are not pages, before reading the body"""
+        content_type = response.content_type or ''
+        if response.headers.get('Content-Type') and not is_text_content_type(content_type):
+            return f"unexpected content type {content_type}"
+        return None
+
+    async def _read_body(self, response, max_bytes, stop_marker):
+        """Stream the body until the end, the byte ceiling, or the stop marker"""
+        marker = stop_marker.encode('utf-8') if stop_marker else None
+        chunks = []
+        size = 0
+        tail = b''
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            if not chunks and b'\x00' in chunk[:1024]:
+                return b'', False, False, 'binary content'
+            chunks.append(chunk)
+            size += len(chunk)
+
+            if marker:
+                window = tail + chunk
+                if marker in window:
+                    return b''.join(chunks), True, False, None
+                tail = window[-len(marker):]
+
+            if max_bytes and size >= max_bytes:
+                return b''.join(chunks)[:max_bytes], False, True, None
+
+        return b''.join(chunks), False, False, None
+
+    def stats(self):
+        """Return validator cache hit/miss counts"""
+        if not self.validator_cache:
+            return {'cache_hits': 0, 'cache_misses': 0}
+        return {
+            'cache_hits': self.validator_cache.hits,
+            'cache_misses': self.validator_cache.misses
+        }
+
+    def forget(self, url):
+        """Drop a URL's validators so the next run downloads it in full"""
+        if self.validator_cache:
+            self.validator_cache.forget(url)
+
+    def save(self):
+        """Persist cache state, to be called once the run's data is committed"""
+        if self.validator_cache:
+            self.validator_cache.save()
@@ -0,0 +1,86 @@
+import html as html_lib
+import re
+from urllib.parse import urljoin, urlparse, parse_qsl, urlencode, urlunparse
+
+PAGE_PLACEHOLDER = '{page}'
+
+# Query parameters commonly used for the page number
+PAGE_PARAMS = ('page', 'p', 'pg', 'pagenum', 'page_num', 'pagenumber', 'currentpage', 'pageindex')
+
+# Link texts / labels that mean "next page", in English and Hebrew
+NEXT_LABELS = {
+    'next', 'next page', 'next »', 'הבא', 'הבאה', 'לעמוד הבא', 'עמוד הבא', 'הבא »', '« הבא',
+    '»', '›', '>', '>>'
+}
+
+LINK_NEXT = re.compile(r'<link\b[^>]*\brel=["\']?next\b[^>]*>', re.I)
+ANCHOR = re.compile(r'<a\b([^>]*)>(.*?)</a>', re.I | re.S)
+HREF = re.compile(r'\bhref=["\']([^"\']+)["\']', re.I)
+NEXT_ATTR = re.compile(r'\brel=["\']?next\b|\baria-label=["\'][^"\']*(?:next|הבא)|\bclass=["\'][^"\']*\bnext\b', re.I)
+TAGS = re.compile(r'<[^>]+>')
+PATH_PAGE = re.compile(r'(/(?:page|p|pg)[/-]?)(\d+)(?=/|$)', re.I)
+
+def find_next_page_url(html, page_url):
+    """Find the absolute URL of the "next page" link in a page, if any"""
+    if not html:
+        return None
+
+    for tag in LINK_NEXT.findall(html):
+        href = HREF.search(tag)
+        if href:
+            return urljoin(page_url, html_lib.unescape(href.group(1)))
+
+    for attrs, text in ANCHOR.findall(html):
+        href = HREF.search(attrs)
+        if not href or href.group(1).startswith(('#', 'javascript:')):
+            continue
+        label = re.sub(r'\s+', ' ', html_lib.unescape(TAGS.sub('', text))).strip().lower()
+        if NEXT_ATTR.search(attrs) or label in NEXT_LABELS:
+            return urljoin(page_url, html_lib.unescape(href.group(1)))
+
+    return None
+
+def template_from_next_url(next_url):
+    """Turn a page-2 URL into a template with a {page} placeholder"""
+    parts = urlparse(next_url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    for index, (name, value) in enumerate(query):
+        if name.lower() in PAGE_PARAMS and value.isdigit():
+            query[index] = (name, PAGE_PLACEHOLDER)
+            return urlunparse(parts._replace(query=urlencode(query, safe='{}')))
+
+    if PATH_PAGE.search(parts.path):
+        path = PATH_PAGE.sub(lambda m: m.group(1) + PAGE_PLACEHOLDER, parts.path, count=1)
+        return urlunparse(parts._replace(path=path))
+
+    return None
+
+def template_for_param(page_url, param):
+    """Build a template that puts the page number in a query parameter"""
+    parts = urlparse(page_url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != param]
+    query.append((param, PAGE_PLACEHOLDER))
+    return urlunparse(parts._replace(query=urlencode(query, safe='{}')))
+
+def build_page_url(template, number):
+    """Fill a pagination template with a page number"""
+    return template.replace(PAGE_PLACEHOLDER, str(number))
+
+def detect_pagination(html, page_url, pagination_config=None):
+    """Work out how to reach further pages of a listing page
+
+    Uses the site's `pagination` settings from websites_config.yaml when
+    given (`url_template` or `param`), otherwise the page's next-page link.
+    Returns a URL template with a {page} placeholder, or None.
+    """
+    pagination_config = pagination_config or {}
+    if pagination_config.get('url_template'):
+        return pagination_config['url_template']
+    if pagination_config.get('param'):
+        return template_for_param(page_url, pagination_config['param'])
+
+    next_url = find_next_page_url(html, page_url)
+    if not next_url:
+        return None
+    return template_from_next_url(next_url)
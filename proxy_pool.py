@@ -0,0 +1,147 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Responses that usually mean the proxy (or its IP) is the problem
+PROXY_ERROR_STATUSES = {403, 407, 429, 502, 503, 504}
+
+class ProxyPool:
+    """Rotating proxy pool with latency and error-rate health scoring
+
+    The same proxy is used for ``rotate_every`` requests, then the pool moves
+    to another healthy one. Faster proxies with fewer errors are picked more
+    often. A proxy whose error rate climbs above ``max_error_rate`` is evicted
+    for ``eviction_time`` seconds and then given a fresh start.
+    """
+
+    def __init__(self, proxies, rotate_every=10, max_error_rate=0.5, min_samples=3,
+                 eviction_time=600, clock=time.monotonic):
+        self.rotate_every = max(1, int(rotate_every))
+        self.max_error_rate = float(max_error_rate)
+        self.min_samples = max(1, int(min_samples))
+        self.eviction_time = float(eviction_time)
+        self.clock = clock
+        self.proxies = {proxy: self._fresh_health() for proxy in proxies}
+        self.failure_latency = 10.0
+        self._current = None
+        self._uses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, proxy_settings):
+        """Create a pool from `proxy_settings`, or None when proxies are disabled"""
+        proxy_settings = proxy_settings or {}
+        if not proxy_settings.get('enabled') or not proxy_settings.get('proxy_list'):
+            return None
+        return cls(
+            proxy_settings['proxy_list'],
+            rotate_every=proxy_settings.get('rotate_every', 10),
+            max_error_rate=proxy_settings.get('max_error_rate', 0.5),
+            min_samples=proxy_settings.get('min_samples', 3),
+            eviction_time=proxy_settings.get('eviction_time', 600)
+        )
+
+    @staticmethod
+    def _fresh_health():
+        return {'latency': None, 'error_rate': 0.0, 'samples': 0, 'evicted_until': 0.0}
+
+    def _healthy(self):
+        now = self.clock()
+        healthy = []
+        for proxy, health in self.proxies.items():
+            if health['evicted_until'] and health['evicted_until'] <= now:
+                logger.info(f"Proxy {proxy} back in rotation")
+                self.proxies[proxy] = health = self._fresh_health()
+            if not health['evicted_until']:
+                healthy.append(proxy)
+        return healthy
+
+    def score(self, proxy):
+        """Lower is better: latency, penalised by error rate. Untried proxies score 0"""
+        health = self.proxies[proxy]
+        if health['latency'] is None:
+            return 0.0
+        return health['latency'] * (1 + 4 * health['error_rate'])
+
+    def _pick(self, candidates):
+        untried = [proxy for proxy in candidates if self.proxies[proxy]['latency'] is None]
+        if untried:
+            return random.choice(untried)
+        weights = [1.0 / max(self.score(proxy), 0.001) for proxy in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def acquire(self):
+        """Proxy URL for the next request, or None to connect directly"""
+        with self._lock:
+            healthy = self._healthy()
+            if not healthy:
+                if self.proxies:
+                    logger.warning("No healthy proxies left, connecting directly")
+                return None
+            if self._current in healthy and self._uses < self.rotate_every:
+                self._uses += 1
+                return self._current
+
+            candidates = [proxy for proxy in healthy if proxy != self._current] or healthy
+            self._current = self._pick(candidates)
+            self._uses = 1
+            return self._current
+
+    def report(self, proxy, latency=None, ok=True):
+        """Feed the outcome of a request made through ``proxy`` back into its score"""
+        if proxy not in self.proxies:
+            return
+        with self._lock:
+            health = self.proxies[proxy]
+            health['samples'] += 1
+            health['error_rate'] = 0.7 * health['error_rate'] + 0.3 * (0.0 if ok else 1.0)
+            if latency is None and not ok:
+                # Failed before any response: score it like a very slow request
+                latency = self.failure_latency
+            if latency is not None:
+                health['latency'] = latency if health['latency'] is None else 0.7 * health['latency'] + 0.3 * latency
+
+            if health['samples'] >= self.min_samples and health['error_rate'] > self.max_error_rate:
+                health['evicted_until'] = self.clock() + self.eviction_time
+                logger.warning(f"Evicting proxy {proxy} (error rate {health['error_rate']:.2f})")
+                if self._current == proxy:
+                    self._current = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                proxy: {
+                    'latency': round(health['latency'], 3) if health['latency'] is not None else None,
+                    'error_rate': round(health['error_rate'], 3),
+                    'samples': health['samples'],
+                    'evicted': bool(health['evicted_until'])
+                }
+                for proxy, health in self.proxies.items()
+            }
+
+def chrome_proxy_argument(proxy):
+    """Chrome's --proxy-server flag for a proxy URL, or None for a proxy with credentials
+
+    Chrome ignores credentials in --proxy-server, so an authenticated proxy
+    would only answer 407 to the browser.
+    """
+    parts = urlparse(proxy)
+    if parts.username or parts.password:
+        return None
+    return f"--proxy-server={parts.scheme}://{parts.hostname}:{parts.port}" if parts.port else \
+        f"--proxy-server={parts.scheme}://{parts.hostname}"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_proxy_pool(proxy_settings=None):
+    """Return the process-wide proxy pool so health scores survive between runs"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProxyPool.from_settings(proxy_settings) or ProxyPool([])
+        return _pool if _pool.proxies else None
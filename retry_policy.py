@@ -0,0 +1,136 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring Retry-After"""
+
+    def __init__(self, max_retries=3, base_delay=1.0, max_delay=30.0):
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+
+    @classmethod
+    def from_settings(cls, settings):
+        settings = settings or {}
+        return cls(
+            max_retries=settings.get('max_retries', 3),
+            base_delay=settings.get('retry_backoff', 1.0),
+            max_delay=settings.get('retry_max_delay', 30.0)
+        )
+
+    def is_retryable(self, status):
+        return status in RETRYABLE_STATUSES
+
+    def backoff(self, attempt):
+        """Delay before retry number ``attempt + 1``"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def delay(self, attempt, retry_after=None):
+        """Delay before the next attempt, or None if we should give up"""
+        if attempt >= self.max_retries:
+            return None
+        if retry_after is not None:
+            # The server told us when to come back; don't stall the run for longer than max_delay
+            return retry_after if retry_after <= self.max_delay else None
+        return self.backoff(attempt)
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class CircuitBreaker:
+    """Per-host circuit breaker
+
+    After ``failure_threshold`` consecutive failures a host's circuit opens
+    and requests to it are skipped. Once ``reset_timeout`` seconds have passed
+    a single probe request is let through: success closes the circuit,
+    failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=1800, clock=time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.clock = clock
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        settings = settings or {}
+        return cls(
+            failure_threshold=settings.get('breaker_failure_threshold', 5),
+            reset_timeout=settings.get('breaker_reset_timeout', 1800)
+        )
+
+    def _state(self, host):
+        return self._hosts.setdefault(host, {'state': self.CLOSED, 'failures': 0, 'opened_at': 0.0})
+
+    def state(self, host):
+        with self._lock:
+            return self._state(host)['state']
+
+    def allow(self, host):
+        """Whether a request to ``host`` may be sent now"""
+        with self._lock:
+            entry = self._state(host)
+            if entry['state'] == self.CLOSED:
+                return True
+            # Also re-probe if a previous probe never reported back
+            if self.clock() - entry['opened_at'] >= self.reset_timeout:
+                entry.update(state=self.HALF_OPEN, opened_at=self.clock())
+                logger.info(f"Circuit half-open for {host}, sending a probe request")
+                return True
+            return False
+
+    def is_probing(self, host):
+        return self.state(host) == self.HALF_OPEN
+
+    def record_success(self, host):
+        with self._lock:
+            entry = self._state(host)
+            if entry['state'] != self.CLOSED:
+                logger.info(f"Circuit closed for {host}")
+            entry.update(state=self.CLOSED, failures=0)
+
+    def record_failure(self, host):
+        with self._lock:
+            entry = self._state(host)
+            entry['failures'] += 1
+            if entry['state'] == self.HALF_OPEN or entry['failures'] >= self.failure_threshold:
+                if entry['state'] != self.OPEN:
+                    logger.warning(f"Circuit opened for {host} after {entry['failures']} failures")
+                entry.update(state=self.OPEN, opened_at=self.clock())
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+def get_circuit_breaker(settings=None):
+    """Return the process-wide circuit breaker so host state survives between runs"""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker.from_settings(settings)
+        return _breaker
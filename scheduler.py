@@ -12,6 +12,8 @@ class ScraperScheduler:
         self.setup_logging()
         self.scheduler = BackgroundScheduler()
         self.orchestrator = RealEstateOrchestrator()
+        # Start the browsers now so the first run does not wait for them
+        self.orchestrator.driver_pool.start()
         self.setup_signal_handlers()
         
     def setup_logging(self):
@@ -32,6 +34,7 @@ class ScraperScheduler:
         """Handle shutdown signals"""
         self.logger.info("Received shutdown signal. Stopping scheduler...")
         self.scheduler.shutdown()
+        self.orchestrator.driver_pool.close()
         sys.exit(0)
 
     def run_scraper(self):
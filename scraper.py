@@ -1,41 +1,68 @@
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
 from models import db, Property, ScrapingLog
 from flask import current_app
+from host_scheduler import HostScheduler
+from extraction_plans import extract_site_page, site_plan_specs
+from listing_extractor import extract_listings, clean_text, extract_location, get_parse_pool
+from http_client import get_http_client
+from hebrew_text import record_tokens
+from keyword_matcher import get_classifier
+from page_fetcher import PageFetcher
+from pagination import detect_pagination, build_page_url
+from selector_memo import SelectorMemo
+from sitemap_discovery import SitemapDiscovery
+from content_fingerprint import FingerprintStore
+from url_resolver import UrlResolver
+from validator_cache import ValidatorCache
+from website_manager import WebsiteManager, normalize_host
 import re
+from urllib.parse import urlparse
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class RealEstateScraper:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.session = None
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0'
+        self.website_manager = WebsiteManager()
+        self.settings = settings if settings is not None else self.website_manager.get_settings()
+        self.scheduler = HostScheduler.from_settings(self.settings)
+        self.http_client = get_http_client(self.settings)
+        self.fetcher = PageFetcher.from_settings(
+            self.settings,
+            ValidatorCache(),
+            site_configs=self.website_manager.get_site_configs(),
+            proxy_settings=self.website_manager.get_proxy_settings()
+        )
+        self.fingerprints = FingerprintStore()
+        self.parser_backend = self.settings.get('html_parser', 'auto')
+        self.partial_parse = self.settings.get('partial_parse', True)
+        self.parse_pool = get_parse_pool(self.settings)
+        self.selector_memo = SelectorMemo.from_settings(self.settings)
+        # Configured sites are extracted with their own selectors, compiled once
+        self.site_plans = site_plan_specs(self.website_manager.get_site_configs())
+        self.structured_configs = {
+            normalize_host(urlparse(config['base_url']).hostname): config.get('structured_data') or {}
+            for config in self.website_manager.get_site_configs().values()
         }
+        self.resolver = UrlResolver.from_settings(self.settings)
+        self.discovery = SitemapDiscovery.from_settings(self.fetcher, self.settings)
+        self.page_templates = {}
 
     async def create_session(self):
         if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
+            self.session = await self.http_client.get_session()
         return self.session
 
     async def close_session(self):
         if self.session:
-            await self.session.close()
+            await self.http_client.release_session()
             self.session = None
 
     def clean_text(self, text):
-        if not text:
-            return ""
-        return re.sub(r'\s+', ' ', text.strip())
+        return clean_text(text)
 
     def extract_price(self, text):
         if not text:
@@ -53,110 +80,172 @@ class RealEstateScraper:
         return None
 
     def extract_location(self, text):
-        if not text:
-            return None
-        # Remove common words and clean up
-        location = re.sub(r'(?i)(apartment|house|property|in|at|near|next to)', '', text)
-        return self.clean_text(location)
+        return extract_location(text)
 
-    async def scrape_url(self, url):
+    async def scrape_url(self, url, detect_pages=True):
         try:
             session = await self.create_session()
-            async with session.get(url, timeout=30) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to fetch {url}: {response.status}")
-                    return []
+            response = await self.fetcher.fetch(session, url)
+            if not response.ok:
+                # Failed, or unchanged since the last run (304): nothing to parse
+                return []
 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                properties = []
-                
-                # Common property listing selectors
-                selectors = [
-                    '.property-item', '.listing-item', '.real-estate-item',
-                    '[class*="property"]', '[class*="listing"]', '[class*="apartment"]',
-                    'article', '.card', '.item', '.feed-item', '.search-result'
-                ]
-                
-                for selector in selectors:
-                    listings = soup.select(selector)
-                    if listings:
-                        for listing in listings:
-                            try:
-                                # Extract title
-                                title_elem = listing.find(['h1', 'h2', 'h3', 'h4', '.title', '[class*="title"]', '[class*="header"]'])
-                                title = self.clean_text(title_elem.text) if title_elem else None
-                                
-                                # Extract price
-                                price_pattern = r'(?:[\d,]+(?:\.\d{2})?(?=\s*[₪$€])|(?<=[$₪€]\s*)[\d,]+(?:\.\d{2})?)'
-                                price_text = listing.get_text()
-                                price_match = re.search(price_pattern, price_text)
-                                price = float(re.sub(r'[^\d.]', '', price_match.group())) if price_match else None
-                                
-                                # Extract location
-                                location_elem = listing.find(['address', '.location', '[class*="location"]', '[class*="address"]'])
-                                location = self.extract_location(location_elem.text) if location_elem else None
-                                
-                                # Extract URL
-                                link = listing.find('a')
-                                url = link.get('href', '') if link else None
-                                
-                                # Make URL absolute if it's relative
-                                if url and url.startswith('/'):
-                                    url = f"https://{response.url.host}{url}"
-                                elif url and not url.startswith('http'):
-                                    url = f"{response.url.scheme}://{response.url.host}/{url.lstrip('/')}"
-                                
-                                # Extract image
-                                img = listing.find('img')
-                                image_url = img.get('src', '') if img else None
-                                
-                                # Make image URL absolute if it's relative
-                                if image_url and image_url.startswith('/'):
-                                    image_url = f"https://{response.url.host}{image_url}"
-                                elif image_url and not image_url.startswith('http'):
-                                    image_url = f"{response.url.scheme}://{response.url.host}/{image_url.lstrip('/')}"
-                                
-                                # Only add if we have at least title and either price or location
-                                if title and (price or location):
-                                    properties.append({
-                                        'title': title,
-                                        'price': price,
-                                        'location': location,
-                                        'url': url,
-                                        'image_url': image_url,
-                                        'source': response.url.host
-                                    })
-                            
-                            except Exception as e:
-                                logger.error(f"Error parsing listing: {str(e)}")
-                                continue
-                        
-                        # If we found properties using this selector, no need to try others
-                        if properties:
-                            break
-                
-                return properties
+            if self.fingerprints.is_unchanged(url, response.text):
+                logger.info(f"Content unchanged since last run: {url}")
+                return []
+
+            if detect_pages:
+                self.remember_pagination(url, response.text)
+            # Parse in a worker process so other downloads keep flowing meanwhile. Embedded JSON
+            # is read first; then configured sites use their own selectors, and others start
+            # from the container that worked last time
+            host = normalize_host(response.url.host)
+            spec = self.site_plans.get(host)
+            result = await self.parse_pool.run(
+                extract_site_page, response.text, str(response.url), self.parser_backend,
+                spec, None if spec else self.selector_memo.plan_for(host), self.selector_memo.min_yield,
+                self.partial_parse, self.structured_configs.get(host)
+            )
+            if result['method'] in ('memo', 'detected'):
+                self.selector_memo.record(host, result)
+            logger.debug(f"Parsed {url}: {len(result['listings'])} listings via {result['method']}, "
+                         f"{result['traversals']} page walk(s)")
+            return self.classify_listings(result['listings'])
 
         except Exception as e:
             logger.error(f"Error scraping {url}: {str(e)}")
+            # The page was not parsed, so it must not count as seen on the next run
+            self.fetcher.forget(url)
+            self.fingerprints.forget(url)
             return []
 
+    def classify_listings(self, listings):
+        """Fill in a missing property type from the listing's own wording"""
+        classifier = get_classifier(self.website_manager.config_path)
+        for listing in listings:
+            if not listing.get('property_type'):
+                tokens = record_tokens(listing, 'title', 'description')
+                listing['property_type'] = classifier.classify(tokens=tokens)['property_type']
+            # The token cache is working state, not part of the listing that is returned or stored
+            listing.pop('tokens', None)
+        return listings
+
+    async def scrape_next_page(self, url):
+        """Scrape a deeper page of a paginated source"""
+        return await self.scrape_url(url, detect_pages=False)
+
+    def remember_pagination(self, url, html):
+        """Record how to reach pages 2..N of a listing page"""
+        name, site = self.website_manager.get_website_for_host(urlparse(url).hostname)
+        config = (site or {}).get('pagination') or {}
+        if config.get('enabled') is False:
+            return
+        template = detect_pagination(html, url, config)
+        if template:
+            self.page_templates[url] = {
+                'template': template,
+                'max_pages': int(config.get('max_pages', self.settings.get('max_pages', 5))),
+                'batch_size': int(config.get('batch_size', self.scheduler.per_host_concurrency))
+            }
+
+    def known_listing_urls(self, urls):
+        """Return which listing URLs are already stored"""
+        urls = [url for url in urls if url]
+        if not urls:
+            return set()
+        rows = db.session.query(Property.url).filter(Property.url.in_(urls)).all()
+        return {row[0] for row in rows}
+
+    async def crawl_pages(self, first_pages, first_properties):
+        """Fetch pages 2..N of paginated sources in concurrent waves
+
+        Each wave requests up to `batch_size` pages per source at once, and
+        the scheduler spreads them under the per-host limits. A source stops
+        at the first page that brings no listing we have not seen before.
+        """
+        crawls = []
+        for url in first_pages:
+            if url in self.page_templates:
+                crawls.append(dict(self.page_templates[url], source=url, next=2))
+
+        seen = {prop['url'] for prop in first_properties if prop.get('url')}
+        properties = []
+        while crawls:
+            wave = {}
+            for crawl in crawls:
+                last = min(crawl['next'] + crawl['batch_size'] - 1, crawl['max_pages'])
+                wave[crawl['source']] = [build_page_url(crawl['template'], number)
+                                         for number in range(crawl['next'], last + 1)]
+            wave_urls = [url for pages in wave.values() for url in pages]
+            results = dict(zip(wave_urls, await self.scheduler.run(wave_urls, self.scrape_next_page)))
+
+            remaining = []
+            for crawl in crawls:
+                exhausted = False
+                for url in wave[crawl['source']]:
+                    page_properties = results.get(url) or []
+                    listing_urls = [prop['url'] for prop in page_properties if prop.get('url')]
+                    known = seen | self.known_listing_urls(listing_urls)
+                    properties.extend(page_properties)
+                    seen.update(listing_urls)
+                    if not any(listing_url not in known for listing_url in listing_urls):
+                        logger.info(f"No new listings on {url}, stopping pagination for {crawl['source']}")
+                        exhausted = True
+                        break
+                crawl['next'] += len(wave[crawl['source']])
+                if not exhausted and crawl['next'] <= crawl['max_pages']:
+                    remaining.append(crawl)
+            crawls = remaining
+
+        return properties
+
+    async def discover_urls(self, session, urls):
+        """Swap search pages for changed listings on sources with sitemap discovery
+
+        Sources whose sitemaps can be read are crawled from the listing URLs
+        added or modified since the last run instead of their search pages;
+        the rest keep their search pages and pagination. Returns
+        ``(search pages, listing URLs)``.
+        """
+        discovered = await self.discovery.discover(session, self.website_manager.get_site_configs())
+        if not discovered:
+            return urls, []
+
+        kept = [url for url in urls if normalize_host(urlparse(url).hostname) not in discovered]
+        listing_urls = [url for host_urls in discovered.values() for url in host_urls]
+        logger.info(f"Sitemap discovery: {len(listing_urls)} changed listings replace "
+                    f"{len(urls) - len(kept)} search pages")
+        return kept, listing_urls
+
+    def parse_listings(self, html, page_url):
+        """Extract property listings from a page's HTML"""
+        return extract_listings(html, page_url, self.parser_backend)
+
     async def scrape_urls(self, urls):
-        """Scrape multiple URLs concurrently"""
+        """Scrape multiple URLs concurrently, politely per host"""
+        start_time = datetime.utcnow()
         try:
-            tasks = []
-            for url in urls:
-                tasks.append(self.scrape_url(url))
-            
-            results = await asyncio.gather(*tasks)
+            # Expand short links first so requests go straight to the origin host
+            session = await self.create_session()
+            urls = await self.resolver.resolve_all(session, urls)
+            urls, listing_urls = await self.discover_urls(session, urls)
+            # Discovered listings are single pages: no pagination to detect or crawl
+            detail_pages = set(listing_urls)
+            results = await self.scheduler.run(
+                urls + listing_urls,
+                lambda url: self.scrape_url(url, detect_pages=url not in detail_pages)
+            )
             
             all_properties = []
             for properties in results:
-                all_properties.extend(properties)
+                all_properties.extend(properties or [])
+            all_properties.extend(await self.crawl_pages(urls, all_properties))
+
+            await self.resolver.wait_for_refreshes()
+            self.resolver.save()
             
             # Save to database
+            new_count = 0
             for prop in all_properties:
                 # Check if property already exists (based on URL)
                 existing = Property.query.filter_by(url=prop['url']).first() if prop['url'] else None
@@ -164,24 +253,44 @@ class RealEstateScraper:
                 if not existing:
                     new_property = Property(
                         title=prop['title'],
+                        description=prop.get('description'),
                         price=prop['price'],
                         location=prop['location'],
+                        property_type=prop.get('property_type'),
                         url=prop['url'],
                         image_url=prop['image_url'],
                         source=prop['source'],
                         date_scraped=datetime.utcnow()
                     )
                     db.session.add(new_property)
+                    new_count += 1
             
             # Log the scraping
+            cache_stats = self.fetcher.stats()
             log = ScrapingLog(
-                timestamp=datetime.utcnow(),
-                properties_found=len(all_properties)
+                job='properties',
+                start_time=start_time,
+                end_time=datetime.utcnow(),
+                status='success',
+                items_scraped=len(all_properties),
+                items_new=new_count,
+                cache_hits=cache_stats['cache_hits'],
+                cache_misses=cache_stats['cache_misses']
             )
             db.session.add(log)
             
             db.session.commit()
-            logger.info(f"Scraped {len(all_properties)} properties")
+            # Only remember validators and fingerprints once the pages they describe are stored
+            self.fetcher.save()
+            self.fingerprints.save()
+            self.discovery.save()
+            self.selector_memo.save()
+            logger.info(f"Scraped {len(all_properties)} properties "
+                        f"(cache hits: {cache_stats['cache_hits']}, misses: {cache_stats['cache_misses']}, "
+                        f"unchanged pages skipped: {self.fingerprints.unchanged})")
+            memo_stats = self.selector_memo.stats()
+            logger.info(f"Listing container memo: {memo_stats['memo_hits']}/{memo_stats['pages']} pages hit, "
+                        f"{memo_stats['traversals_per_page']} page walks per page")
             
             return all_properties
             
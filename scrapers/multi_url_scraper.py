@@ -1,9 +1,9 @@
-import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 import logging
 from typing import List, Dict
 import json
+from http_client import get_http_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,16 +13,17 @@ class MultiUrlScraper:
     
     def __init__(self):
         self.session = None
+        self.http_client = get_http_client()
         
     async def create_session(self):
-        """Create aiohttp session"""
+        """Borrow the shared pooled session"""
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            self.session = await self.http_client.get_session()
             
     async def close_session(self):
-        """Close aiohttp session"""
+        """Return the shared session to the client"""
         if self.session:
-            await self.session.close()
+            await self.http_client.release_session()
             self.session = None
             
     async def fetch_url(self, url: str) -> str:
@@ -44,7 +45,7 @@ class MultiUrlScraper:
             if not html:
                 return None
                 
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = make_soup(html)
             
             # Extract basic information
             data = {
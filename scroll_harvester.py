@@ -0,0 +1,168 @@
+import logging
+import os
+from config import Config
+from json_store import JsonStore
+from browser_profile import scroll_for_more
+from extraction_plans import SIZE_PATTERN, to_number
+from html_parser import make_soup
+from listing_extractor import PRICE_PATTERN, clean_text
+
+logger = logging.getLogger(__name__)
+
+# Top-level posts of a group feed
+POST_SELECTOR = "div[role='feed'] > div"
+
+# Post permalinks: /groups/<group>/posts/<id>, /permalink/<id>, story_fbid=<id>
+POST_ID_PATTERN = r'(?:/posts/|/permalink/|story_fbid=|multi_permalinks=)(\d+)'
+
+# Reads the posts on screen as [id, html], skipping ids already handled this run.
+# Feeds drop scrolled-past nodes, so every pass reads whatever is mounted now.
+READ_POSTS_SCRIPT = """
+const [selector, pattern, idAttribute, known] = arguments;
+const idPattern = new RegExp(pattern);
+const skip = new Set(known);
+const posts = [];
+for (const element of document.querySelectorAll(selector)) {
+    let id = idAttribute ? element.getAttribute(idAttribute) : null;
+    if (!id) {
+        for (const link of element.querySelectorAll('a[href]')) {
+            const match = link.href.match(idPattern);
+            if (match) { id = match[1]; break; }
+        }
+    }
+    if (id && !skip.has(id)) {
+        skip.add(id);
+        posts.push([id, element.outerHTML]);
+    }
+}
+return posts;
+"""
+
+class SeenPosts:
+    """Per-group record of the post IDs already ingested, kept between runs"""
+
+    def __init__(self, path=None, max_ids=2000):
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, 'seen_posts.json'))
+        self.max_ids = int(max_ids)
+
+    def seen(self, group):
+        return set(self.store.get(group) or [])
+
+    def add(self, group, post_ids):
+        """Remember new post IDs for a group, keeping the most recent max_ids"""
+        if not post_ids:
+            return
+        known = self.store.get(group) or []
+        recorded = set(known)
+        fresh = [post_id for post_id in post_ids if post_id not in recorded]
+        self.store.set(group, (fresh + known)[:self.max_ids])
+
+    def save(self):
+        return self.store.save()
+
+class ScrollHarvester:
+    """Collects the new posts of an infinite-scroll feed
+
+    Each scroll waits for new post nodes to be added (a MutationObserver,
+    see browser_profile.scroll_for_more) instead of sleeping a fixed time.
+    Progress is judged by post IDs rather than node counts, since the feed
+    unmounts posts scrolled past. Scrolling stops once ``max_posts`` new
+    posts are collected, the feed adds no unread post, or ``stale_screens``
+    scrolls in a row turn up only posts ingested on an earlier run.
+    """
+
+    def __init__(self, driver, post_selector, seen_posts=None, max_posts=50, scroll_timeout=2,
+                 stale_screens=1, id_attribute=None, id_pattern=POST_ID_PATTERN, max_scrolls=200):
+        self.driver = driver
+        self.post_selector = post_selector
+        self.seen_posts = seen_posts
+        self.max_posts = int(max_posts)
+        self.scroll_timeout = float(scroll_timeout)
+        self.stale_screens = max(1, int(stale_screens))
+        self.id_attribute = id_attribute
+        self.id_pattern = id_pattern
+        self.max_scrolls = int(max_scrolls)
+        self.scrolls = 0
+
+    def read_posts(self, known):
+        return self.driver.execute_script(READ_POSTS_SCRIPT, self.post_selector, self.id_pattern,
+                                          self.id_attribute, list(known))
+
+
+    def harvest(self, group, url=None, record=True):
+        """Return [(post_id, html)] for posts not seen before, newest first
+
+        ``group`` keys the seen-post record; ``url`` is loaded first when
+        given. With ``record`` the new IDs are added to ``seen_posts`` (pass
+        False to add them only once the posts are kept); either way call
+        ``seen_posts.save()`` once the posts are stored.
+        """
+        if url:
+            self.driver.get(url)
+        seen = self.seen_posts.seen(group) if self.seen_posts else set()
+        handled = set()
+        posts = []
+        stale = empty = 0
+        self.scrolls = 0
+
+        on_screen = self.read_posts(handled)
+        while True:
+            handled.update(post_id for post_id, html in on_screen)
+            new = [(post_id, html) for post_id, html in on_screen if post_id not in seen]
+            posts.extend(new[:self.max_posts - len(posts)])
+
+            if on_screen and not new:
+                stale += 1
+                if stale >= self.stale_screens:
+                    logger.info(f"Reached posts already seen in {group} after {self.scrolls} scrolls")
+                    break
+            elif new:
+                stale = 0
+
+            if len(posts) >= self.max_posts or self.scrolls >= self.max_scrolls:
+                break
+            added = scroll_for_more(self.driver, self.post_selector, self.scroll_timeout)
+            self.scrolls += 1
+            on_screen = self.read_posts(handled)
+            if on_screen:
+                empty = 0
+                continue
+            # Nodes added without an unread post (placeholders, re-mounts) get one more scroll
+            empty += 1
+            if not added or empty >= 2:
+                logger.info(f"End of feed for {group} after {self.scrolls} scrolls")
+                break
+
+        if self.seen_posts and record:
+            self.seen_posts.add(group, [post_id for post_id, html in posts])
+        return posts
+
+def post_listing(post_id, html, group, classifier, parser_backend=None):
+    """Listing for a group post, or None unless its wording is commercial
+
+    ``group`` is a `facebook_groups` entry and ``classifier`` a
+    keyword_matcher.PropertyClassifier built from `facebook_settings`.
+    """
+    soup = make_soup(html, parser_backend)
+    text = clean_text(soup.get_text(' '))
+    if not text:
+        return None
+    result = classifier.classify(text)
+    if result['category'] != 'commercial':
+        return None
+
+    price = PRICE_PATTERN.search(text)
+    size = SIZE_PATTERN.search(text)
+    image = soup.find('img', src=True)
+    return {
+        'title': text[:100],
+        'description': text,
+        'price': to_number(price.group(1) or price.group(2)) if price else None,
+        'size': to_number(size.group(1)) if size else None,
+        'location': None,
+        'property_type': result['property_type'],
+        'url': f"{group['url'].rstrip('/')}/posts/{post_id}/",
+        'image_url': image['src'] if image else None,
+        'source': 'facebook',
+        'group': group.get('name')
+    }
@@ -0,0 +1,72 @@
+import logging
+import os
+from config import Config
+from json_store import JsonStore
+
+logger = logging.getLogger(__name__)
+
+class SelectorMemo:
+    """Per-host memo of the listing container and field tags that worked last time
+
+    Entries keep the container and field tags, a running average of how
+    many listings a page yields with them, and hit/miss/traversal counters
+    so the hit rate can be watched over time.
+    """
+
+    def __init__(self, path=None, min_yield=0.5):
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, 'selectors.json'))
+        self.min_yield = float(min_yield)
+        self.pages = 0
+        self.hits = 0
+        self.traversals = 0
+
+    @classmethod
+    def from_settings(cls, settings):
+        settings = settings or {}
+        return cls(min_yield=settings.get('selector_memo_min_yield', 0.5))
+
+    def plan_for(self, host):
+        """Container plan to try first on a host, or None"""
+        entry = self.store.get(host)
+        if not entry or not entry.get('container'):
+            return None
+        return {'container': entry['container'], 'fields': entry.get('fields') or {},
+                'yield': entry.get('yield', 0)}
+
+    def record(self, host, result):
+        """Remember the outcome of extract_page() for a host"""
+        self.pages += 1
+        self.traversals += result['traversals']
+        if result['memo_hit']:
+            self.hits += 1
+
+        entry = dict(self.store.get(host) or {})
+        entry['pages'] = entry.get('pages', 0) + 1
+        entry['hits'] = entry.get('hits', 0) + (1 if result['memo_hit'] else 0)
+        entry['traversals'] = entry.get('traversals', 0) + result['traversals']
+
+        plan = result.get('plan')
+        if plan:
+            count = len(result['listings'])
+            if plan['container'] != entry.get('container'):
+                if entry.get('container'):
+                    # Yield dropped and detection found a better container
+                    logger.info(f"Listing container for {host} changed: {entry['container']} -> {plan['container']}")
+                    entry['invalidations'] = entry.get('invalidations', 0) + 1
+                entry['container'] = plan['container']
+                entry['fields'] = plan.get('fields') or {}
+                entry['yield'] = count
+            else:
+                entry['yield'] = round(0.7 * entry.get('yield', count) + 0.3 * count, 2)
+        self.store.set(host, entry)
+
+    def stats(self):
+        return {
+            'pages': self.pages,
+            'memo_hits': self.hits,
+            'hit_rate': round(self.hits / self.pages, 3) if self.pages else 0.0,
+            'traversals_per_page': round(self.traversals / self.pages, 2) if self.pages else 0.0
+        }
+
+    def save(self):
+        return self.store.save()
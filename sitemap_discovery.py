@@ -0,0 +1,218 @@
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlparse
+from config import Config
+from json_store import JsonStore
+from website_manager import normalize_host
+
+logger = logging.getLogger(__name__)
+
+ROBOTS_SITEMAP = re.compile(r'^\s*sitemap\s*:\s*(\S+)', re.I | re.M)
+
+def local_name(tag):
+    """Tag name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+def parse_sitemap(xml_text):
+    """Parse a sitemap or sitemap index into (kind, [(loc, lastmod), ...])
+
+    ``kind`` is 'index' or 'urlset'. Entries are read incrementally, so a
+    sitemap cut short by the byte ceiling still yields its complete entries.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    kind = None
+    entries = []
+    try:
+        parser.feed(xml_text)
+        parser.close()
+    except ET.ParseError as e:
+        logger.warning(f"Sitemap is malformed or truncated, using the entries read so far: {str(e)}")
+
+    for event, element in parser.read_events():
+        name = local_name(element.tag)
+        if event == 'start':
+            if kind is None:
+                kind = 'index' if name == 'sitemapindex' else 'urlset'
+            continue
+        if name not in ('url', 'sitemap'):
+            continue
+        loc = lastmod = None
+        for child in element:
+            child_name = local_name(child.tag)
+            if child_name == 'loc' and child.text:
+                loc = child.text.strip()
+            elif child_name == 'lastmod' and child.text:
+                lastmod = child.text.strip()
+        if loc:
+            entries.append((loc, lastmod))
+        element.clear()
+    return kind, entries
+
+class SitemapDiscovery:
+    """Finds listing URLs added or modified since the last crawl via sitemaps
+
+    Each source's sitemaps (from its `sitemap` config, robots.txt, or
+    /sitemap.xml) are read and every URL's <lastmod> is compared with the
+    value stored on the previous run. Child sitemaps of an index whose
+    <lastmod> has not moved are not downloaded at all. URLs without a
+    <lastmod> are only reported the first time they are seen. An index
+    whose children were not all read (file budget, failed fetch) loses its
+    validators, so the next run reads it in full and queues them again.
+    """
+
+    def __init__(self, fetcher, path=None, max_urls=500, max_sitemaps=50):
+        self.fetcher = fetcher
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, 'sitemaps.json'))
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.sitemaps_read = 0
+        self.sitemaps_skipped = 0
+
+    @classmethod
+    def from_settings(cls, fetcher, settings):
+        settings = settings or {}
+        return cls(
+            fetcher,
+            max_urls=int(settings.get('sitemap_max_urls', 500)),
+            max_sitemaps=int(settings.get('sitemap_max_files', 50))
+        )
+
+    @staticmethod
+    def _key(kind, url):
+        return f"{kind}:{url}"
+
+    def _is_changed(self, kind, url, lastmod):
+        stored = self.store.get(self._key(kind, url))
+        if stored is None:
+            return True
+        return lastmod is not None and stored != lastmod
+
+    def _remember(self, kind, url, lastmod):
+        # Store '' for entries without a lastmod so we still know we have seen them
+        self.store.set(self._key(kind, url), lastmod or '')
+
+    async def sitemap_urls(self, session, site_config):
+        """Sitemap locations for a source: configured, from robots.txt, or /sitemap.xml"""
+        base_url = site_config['base_url']
+        configured = (site_config.get('sitemap') or {}).get('urls')
+        if configured:
+            return [urljoin(base_url, url) for url in configured]
+
+        robots_url = urljoin(base_url, '/robots.txt')
+        robots = await self.fetcher.fetch(session, robots_url)
+        if robots.ok:
+            found = ROBOTS_SITEMAP.findall(robots.text)
+            self.store.set(self._key('robots', robots_url), found)
+        elif robots.not_modified:
+            # Unchanged since the last run: reuse the sitemaps it listed then
+            found = self.store.get(self._key('robots', robots_url))
+            if found is None:
+                self.fetcher.forget(robots_url)
+        else:
+            found = None
+        return found or [urljoin(base_url, '/sitemap.xml')]
+
+    async def discover_site(self, session, site_config):
+        """(changed URLs, sitemaps read, incomplete indexes) for one source
+
+        Returns None if the source has no readable sitemap.
+        """
+        sitemap_config = site_config.get('sitemap') or {}
+        pattern = re.compile(sitemap_config['listing_pattern']) if sitemap_config.get('listing_pattern') else None
+        host = normalize_host(urlparse(site_config['base_url']).hostname)
+
+        # (sitemap URL, its <lastmod> in the parent index, the indexes it was found through)
+        pending = [(url, None, ()) for url in await self.sitemap_urls(session, site_config)]
+        changed = []
+        sitemaps = []
+        incomplete = set()
+        read_any = False
+        files = 0
+        while pending and files < self.max_sitemaps:
+            sitemap_url, lastmod, parents = pending.pop(0)
+            files += 1
+            response = await self.fetcher.fetch(session, sitemap_url)
+            if response.not_modified:
+                # Nothing in this sitemap has changed since the last crawl
+                read_any = True
+                self.sitemaps_skipped += 1
+                continue
+            if not response.ok:
+                incomplete.update(parents)
+                continue
+
+            kind, entries = parse_sitemap(response.text)
+            if kind is None:
+                logger.warning(f"Not a sitemap: {sitemap_url}")
+                incomplete.update(parents)
+                continue
+            read_any = True
+            self.sitemaps_read += 1
+            sitemaps.append((sitemap_url, lastmod))
+
+            for loc, entry_lastmod in entries:
+                if kind == 'index':
+                    if self._is_changed('sitemap', loc, entry_lastmod):
+                        pending.append((loc, entry_lastmod, parents + (sitemap_url,)))
+                    else:
+                        self.sitemaps_skipped += 1
+                    continue
+                if normalize_host(urlparse(loc).hostname) != host:
+                    continue
+                if pattern and not pattern.search(loc):
+                    continue
+                if self._is_changed('url', loc, entry_lastmod):
+                    changed.append((loc, entry_lastmod))
+
+        if pending:
+            logger.warning(f"Stopped after {files} sitemaps for {host}; {len(pending)} left for the next run")
+            for sitemap_url, lastmod, parents in pending:
+                incomplete.update(parents)
+        if not read_any:
+            return None
+        return changed, sitemaps, incomplete
+
+    async def discover(self, session, site_configs):
+        """Changed listing URLs per host for every source with sitemap discovery enabled
+
+        Returns ``{host: [url, ...]}``; hosts whose sitemaps could not be read
+        are left out so the caller falls back to its search pages. The new
+        <lastmod> values are only kept in memory until ``save()``.
+        """
+        discovered = {}
+        budget = self.max_urls
+        for name, site_config in site_configs.items():
+            if not (site_config.get('sitemap') or {}).get('enabled'):
+                continue
+            try:
+                found = await self.discover_site(session, site_config)
+            except Exception as e:
+                logger.error(f"Error reading sitemaps for {name}: {str(e)}")
+                continue
+            if found is None:
+                logger.info(f"No readable sitemap for {name}, using its search pages")
+                continue
+            changed, sitemaps, incomplete = found
+
+            # URLs over the budget stay unrecorded, so the next run picks them up
+            selected = changed[:max(0, budget)]
+            budget -= len(selected)
+            for loc, lastmod in selected:
+                self._remember('url', loc, lastmod)
+            for sitemap_url, lastmod in sitemaps:
+                if len(selected) < len(changed) or sitemap_url in incomplete:
+                    # Some changes or child sitemaps were left over: read these in full next time
+                    if self.fetcher.validator_cache:
+                        self.fetcher.validator_cache.forget(sitemap_url)
+                elif lastmod is not None:
+                    self._remember('sitemap', sitemap_url, lastmod)
+            host = normalize_host(urlparse(site_config['base_url']).hostname)
+            discovered[host] = [loc for loc, lastmod in selected]
+            logger.info(f"Sitemap discovery for {name}: {len(changed)} new or modified listings, "
+                        f"fetching {len(selected)}")
+        return discovered
+
+    def save(self):
+        return self.store.save()
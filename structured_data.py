@@ -0,0 +1,231 @@
+import json
+import logging
+import re
+from urllib.parse import urljoin
+from yarl import URL
+from listing_extractor import clean_text
+
+logger = logging.getLogger(__name__)
+
+# Embedded payloads are found in the raw HTML, so no DOM is built for them
+LD_JSON = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.I | re.S)
+NEXT_DATA = re.compile(r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.I | re.S)
+STATE_ASSIGNMENT = re.compile(r'(?:window\.)?(?:__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__|__APP_STATE__)\s*=\s*')
+
+# schema.org types that describe a single listing. Organization, LocalBusiness and
+# Place are left out: sites use them to describe themselves on every page.
+LISTING_TYPES = {
+    'realestatelisting', 'offer', 'product', 'accommodation', 'residence', 'apartment', 'house',
+    'singlefamilyresidence'
+}
+
+# Embedded listings are taken as the page's feed from this many on; fewer (say one
+# promoted Product) only win when the DOM yields no more
+MIN_STRUCTURED_LISTINGS = 2
+
+TITLE_KEYS = ('title', 'name', 'headline', 'heading')
+PRICE_KEYS = ('price', 'priceValue', 'price_value', 'priceAmount', 'rent', 'monthlyPrice')
+LOCATION_KEYS = ('address', 'location', 'fullAddress', 'city', 'neighborhood', 'street')
+URL_KEYS = ('url', 'link', 'href', 'canonicalUrl', 'permalink')
+ID_KEYS = ('token', 'id', 'listingId', 'orderId', 'slug')
+IMAGE_KEYS = ('image', 'images', 'imageUrl', 'image_url', 'coverImage', 'thumbnail', 'photos')
+SIZE_KEYS = ('floorSize', 'squareMeters', 'square_meters', 'squareMeter', 'size', 'area')
+TYPE_KEYS = ('propertyType', 'property_type', 'category')
+DESCRIPTION_KEYS = ('description', 'summary', 'text')
+
+# Keys in nested address objects that are not part of the address text
+ADDRESS_SKIP_KEYS = {'id', '@type', 'coords', 'lat', 'lon', 'lng', 'latitude', 'longitude', 'geo', 'zip', 'postalCode'}
+
+NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+def find_payloads(html):
+    """Yield the JSON payloads embedded in a page: JSON-LD, __NEXT_DATA__ and app-state globals"""
+    if not html:
+        return
+    for pattern, kind in ((LD_JSON, 'ld+json'), (NEXT_DATA, 'next')):
+        for match in pattern.finditer(html):
+            try:
+                yield kind, json.loads(match.group(1))
+            except ValueError as e:
+                logger.debug(f"Skipping malformed {kind} payload: {str(e)}")
+
+    decoder = json.JSONDecoder()
+    for match in STATE_ASSIGNMENT.finditer(html):
+        try:
+            # Decode just the object literal that follows, not the rest of the page
+            payload, end = decoder.raw_decode(html, match.end())
+            yield 'state', payload
+        except ValueError as e:
+            logger.debug(f"Skipping app state that is not plain JSON: {str(e)}")
+
+def first(obj, keys):
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+def to_text(value):
+    """Text of a value; nested objects (like addresses) are joined"""
+    if isinstance(value, str):
+        return clean_text(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, list):
+        return ', '.join(text for text in (to_text(item) for item in value) if text)
+    if isinstance(value, dict):
+        for key in ('text', 'name', 'title', 'value'):
+            if isinstance(value.get(key), (str, int, float)):
+                return to_text(value[key])
+        if value.get('streetAddress') or value.get('addressLocality'):
+            return ', '.join(to_text(value.get(key)) for key in ('streetAddress', 'addressLocality')
+                             if value.get(key))
+        parts = [to_text(item) for key, item in value.items() if key not in ADDRESS_SKIP_KEYS]
+        return ', '.join(part for part in parts if part)
+    return ''
+
+def to_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = NUMBER.search(value)
+        return float(match.group().replace(',', '')) if match else None
+    if isinstance(value, dict):
+        return to_number(first(value, ('value', 'amount', 'price', 'minValue')))
+    if isinstance(value, list) and value:
+        return to_number(value[0])
+    return None
+
+def to_image(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and value:
+        return to_image(value[0])
+    if isinstance(value, dict):
+        return to_image(first(value, ('url', 'src', 'contentUrl', 'original', 'large')))
+    return None
+
+def listing_url(obj, page_url, url_template=None):
+    url = first(obj, URL_KEYS)
+    if isinstance(url, str):
+        return urljoin(str(page_url), url)
+    if url_template and first(obj, ID_KEYS) is not None:
+        return urljoin(str(page_url), url_template.format(**{key: obj.get(key, '') for key in ID_KEYS}))
+    return None
+
+def map_listing(obj, page_url, url_template=None):
+    """Map one embedded listing object onto our listing fields, or None"""
+    offers = obj.get('offers')
+    offer = offers[0] if isinstance(offers, list) and offers else offers if isinstance(offers, dict) else {}
+    item = offer.get('itemOffered') if isinstance(offer.get('itemOffered'), dict) else {}
+
+    title = to_text(first(obj, TITLE_KEYS) or first(item, TITLE_KEYS))
+    price = to_number(first(obj, PRICE_KEYS) or first(offer, ('price', 'lowPrice', 'priceSpecification')))
+    location = to_text(first(obj, LOCATION_KEYS) or first(item, LOCATION_KEYS)) or None
+    if not title or not (price or location):
+        return None
+
+    image = to_image(first(obj, IMAGE_KEYS) or first(item, IMAGE_KEYS))
+    return {
+        'title': title,
+        'price': price,
+        'location': location,
+        'size': to_number(first(obj, SIZE_KEYS) or first(item, SIZE_KEYS)),
+        'property_type': to_text(first(obj, TYPE_KEYS)) or None,
+        'description': to_text(first(obj, DESCRIPTION_KEYS)) or None,
+        'url': listing_url(obj, page_url, url_template) or listing_url(item, page_url, url_template),
+        'image_url': urljoin(str(page_url), image) if image else None,
+        'source': page_url.host
+    }
+
+def ld_listing_objects(payload):
+    """Listing objects in a JSON-LD document (plain, @graph, or ItemList)"""
+    if isinstance(payload, list):
+        for entry in payload:
+            yield from ld_listing_objects(entry)
+        return
+    if not isinstance(payload, dict):
+        return
+    if '@graph' in payload:
+        yield from ld_listing_objects(payload['@graph'])
+    types = payload.get('@type')
+    types = {t.lower() for t in (types if isinstance(types, list) else [types]) if isinstance(t, str)}
+    if 'itemlist' in types:
+        for element in payload.get('itemListElement') or []:
+            if isinstance(element, dict):
+                yield from ld_listing_objects(element.get('item', element))
+    elif types & LISTING_TYPES:
+        yield payload
+
+def looks_like_listing(obj):
+    return (isinstance(obj, dict) and first(obj, TITLE_KEYS) is not None
+            and (first(obj, PRICE_KEYS) is not None or first(obj, LOCATION_KEYS) is not None))
+
+def state_listing_objects(payload, max_nodes=200000):
+    """Listing-like objects from every listing feed in an app-state payload
+
+    Sites often split one page's results across several lists (e.g. private
+    and agency listings), so every list made up mostly of listings is kept.
+    """
+    found = []
+    stack = [payload]
+    visited = 0
+    while stack and visited < max_nodes:
+        node = stack.pop()
+        visited += 1
+        if isinstance(node, dict):
+            stack.extend(value for value in reversed(list(node.values())) if isinstance(value, (dict, list)))
+        elif isinstance(node, list):
+            candidates = [item for item in node if looks_like_listing(item)]
+            if candidates and len(candidates) * 2 >= len(node):
+                found.extend(candidates)
+            stack.extend(item for item in reversed(node) if isinstance(item, (dict, list)))
+    return found
+
+def map_listings(objects, page_url, url_template=None):
+    """Map embedded listing objects onto our listing fields, dropping duplicates"""
+    listings = []
+    seen = set()
+    for obj in objects:
+        try:
+            listing = map_listing(obj, page_url, url_template)
+        except Exception as e:
+            logger.error(f"Error mapping embedded listing: {str(e)}")
+            continue
+        key = listing and (listing['url'] or listing['title'])
+        if listing and key not in seen:
+            seen.add(key)
+            listings.append(listing)
+    return listings
+
+def extract_structured_listings(html, page_url, config=None):
+    """Listings from the JSON a page embeds (JSON-LD, __NEXT_DATA__, app state), or []
+
+    ``config`` is the site's optional `structured_data` section, e.g. a
+    ``url_template`` such as "/realestate/item/{token}" for listings that
+    carry an id instead of a link.
+    """
+    config = config or {}
+    if config.get('enabled') is False:
+        return []
+    page_url = URL(str(page_url))
+    url_template = config.get('url_template')
+
+    best = []
+    for kind, payload in find_payloads(html):
+        objects = list(ld_listing_objects(payload)) if kind == 'ld+json' else state_listing_objects(payload)
+        listings = map_listings(objects, page_url, url_template)
+        if len(listings) > len(best):
+            best = listings
+    return best
+
+def extract_feed_listings(text, page_url, config=None):
+    """Listings from a site's JSON feed response (see `structured_data.feed_url`), or []"""
+    try:
+        payload = json.loads(text)
+    except ValueError as e:
+        logger.error(f"Feed at {page_url} is not JSON: {str(e)}")
+        return []
+    return map_listings(state_listing_objects(payload), URL(str(page_url)), (config or {}).get('url_template'))
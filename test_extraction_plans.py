@@ -0,0 +1,63 @@
+import os
+from extraction_plans import extract_site_page, plan_spec, site_plan_specs
+from website_manager import WebsiteManager
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGE_URL = 'https://www.example.co.il/realestate/commercial'
+
+SITE_CONFIG = {
+    'base_url': 'https://www.example.co.il',
+    'selectors': {
+        'listings': '.feeditem',
+        'title': '.title',
+        'price': '.price',
+        'size': '.square_meters',
+        'location': '.location',
+        'link': 'a.feed_item'
+    }
+}
+
+def load_page():
+    with open(os.path.join(FIXTURES, 'listings_commercial.html'), encoding='utf-8') as f:
+        return f.read()
+
+def test_configured_selectors_extract_every_field():
+    result = extract_site_page(load_page(), PAGE_URL, spec=plan_spec('example', SITE_CONFIG))
+    listings = result['listings']
+    assert result['site_plan'] == 'example' and result['traversals'] == 1
+    assert [listing['url'].rsplit('/', 1)[-1] for listing in listings] == ['71234', '71235', '71236', '71237']
+    assert listings[0]['price'] == 12500.0 and listings[0]['size'] == 120.0
+    assert listings[1]['price'] == 2350000.0
+    assert listings[2]['price'] is None and listings[2]['location'] == 'אזור התעשייה, ראשון לציון'
+    # Unlike the heuristics, the configured location selector leaves the text intact
+    assert listings[3]['location'] == 'Menachem Begin Rd 132, Tel Aviv'
+
+def test_stale_selectors_fall_back_to_heuristics():
+    stale = dict(SITE_CONFIG, selectors=dict(SITE_CONFIG['selectors'], listings='.no-such-card'))
+    result = extract_site_page(load_page(), PAGE_URL, spec=plan_spec('example', stale))
+    assert result['site_plan'] is None
+    assert len(result['listings']) == 4
+
+def test_site_plans_are_compiled_per_host():
+    specs = site_plan_specs(WebsiteManager().get_site_configs())
+    assert specs['yad2.co.il']['selectors']['listings'] == '.feeditem'
+
+    broken = dict(SITE_CONFIG, selectors=dict(SITE_CONFIG['selectors'], title='.title[['))
+    assert site_plan_specs({'broken': broken}) == {}
+
+def test_partial_parse_matches_full_parse():
+    spec = plan_spec('example', SITE_CONFIG)
+    full = extract_site_page(load_page(), PAGE_URL, spec=spec)
+    partial = extract_site_page(load_page(), PAGE_URL, spec=spec, partial=True)
+    assert partial['listings'] == full['listings']
+
+    # Selectors a SoupStrainer cannot express are parsed in full
+    nested = dict(SITE_CONFIG, selectors=dict(SITE_CONFIG['selectors'], listings='.feed > .feeditem'))
+    assert extract_site_page(load_page(), PAGE_URL, spec=plan_spec('example', nested), partial=True)['listings'] == full['listings']
+
+if __name__ == "__main__":
+    test_configured_selectors_extract_every_field()
+    test_stale_selectors_fall_back_to_heuristics()
+    test_site_plans_are_compiled_per_host()
+    test_partial_parse_matches_full_parse()
+    print("All extraction plan tests passed")
@@ -0,0 +1,42 @@
+from hebrew_text import normalize, record_tokens, tokenize
+from keyword_matcher import PropertyClassifier
+from scraper import RealEstateScraper
+
+def test_spelling_variants_share_one_token_stream():
+    variants = ['נדל"ן מסחרי', "נדל''ן מסחרי", 'נדל״ן מסחרי', 'נַדְלָ"ן מִסְחָרִי', '‏נדל"ן‎ מסחרי!']
+    assert {tokenize(text) for text in variants} == {('נדלנ', 'מסחרי')}
+    # Final letters match their regular forms, and any punctuation separates words
+    assert tokenize('משרדים (תל-אביב)—חנות') == ('משרדימ', 'תל', 'אביב', 'חנות')
+    assert normalize("Office's 120 מ\"ר") == 'offices 120 מר'
+    assert tokenize('') == () and tokenize(None) == ()
+
+def test_records_cache_their_token_streams():
+    record = {'title': 'משרד להשכרה', 'description': None, 'location': 'בתל אביב-יפו'}
+    assert record_tokens(record, 'title', 'description') == ['משרד', 'להשכרה']
+    assert record['tokens'] == {'title': ['משרד', 'להשכרה'], 'description': []}
+
+    # Later consumers reuse the cached stream instead of tokenizing again
+    record['title'] = 'changed'
+    assert record_tokens(record, 'title') == ['משרד', 'להשכרה']
+
+def test_classifier_matches_normalized_keywords():
+    classifier = PropertyClassifier(commercial_keywords=['נדל״ן מסחרי'], property_types={
+        'office': {'hebrew': ['משרדים']}
+    })
+    record = {'title': "נדל''ן מסחרי: מִשְׂרָדִים להשכרה", 'description': 'ובמשרדים'}
+    result = classifier.classify(tokens=record_tokens(record, 'title', 'description'))
+    assert result['keywords'] == ['נדל״ן מסחרי', 'משרדים', 'משרדים']
+    assert result['property_type'] == 'office' and result['category'] == 'commercial'
+
+def test_token_cache_is_not_returned_with_listings():
+    scraper = RealEstateScraper()
+    listings = scraper.classify_listings([{'title': 'משרדים להשכרה', 'description': None, 'property_type': None},
+                                          {'title': 'חנות', 'property_type': 'retail'}])
+    assert all('tokens' not in listing for listing in listings)
+
+if __name__ == "__main__":
+    test_spelling_variants_share_one_token_stream()
+    test_records_cache_their_token_streams()
+    test_classifier_matches_normalized_keywords()
+    test_token_cache_is_not_returned_with_listings()
+    print("All Hebrew text tests passed")
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from host_scheduler import HostScheduler, backoff_sleep
+
+def test_interleave_round_robin():
+    scheduler = HostScheduler()
+    urls = [
+        'https://a.example/1', 'https://a.example/2', 'https://a.example/3',
+        'https://b.example/1', 'https://c.example/1', 'https://c.example/2'
+    ]
+    assert scheduler.interleave(urls) == [
+        'https://a.example/1', 'https://b.example/1', 'https://c.example/1',
+        'https://a.example/2', 'https://c.example/2', 'https://a.example/3'
+    ]
+
+def test_limits_and_results_in_order():
+    scheduler = HostScheduler(max_concurrency=3, per_host_concurrency=1)
+    in_flight = {'total': 0, 'peak': 0}
+    per_host = {}
+    peak_per_host = {}
+
+    async def job(url):
+        host = scheduler.host_of(url)
+        in_flight['total'] += 1
+        per_host[host] = per_host.get(host, 0) + 1
+        in_flight['peak'] = max(in_flight['peak'], in_flight['total'])
+        peak_per_host[host] = max(peak_per_host.get(host, 0), per_host[host])
+        await asyncio.sleep(0.01)
+        in_flight['total'] -= 1
+        per_host[host] -= 1
+        return url
+
+    urls = [f'https://h{i % 4}.example/{i}' for i in range(20)]
+    results = asyncio.run(scheduler.run(urls, job))
+
+    assert results == urls
+    assert in_flight['peak'] <= 3
+    assert max(peak_per_host.values()) == 1
+
+def test_request_delay_per_host():
+    scheduler = HostScheduler(max_concurrency=10, per_host_concurrency=5, request_delay=0.05)
+    starts = {}
+
+    async def job(url):
+        starts.setdefault(scheduler.host_of(url), []).append(time.monotonic())
+
+    urls = ['https://a.example/1', 'https://a.example/2', 'https://a.example/3', 'https://b.example/1']
+    asyncio.run(scheduler.run(urls, job))
+
+    a_starts = starts['a.example']
+    gaps = [later - earlier for earlier, later in zip(a_starts, a_starts[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
+    # Other hosts are not held back by a.example's delay
+    assert starts['b.example'][0] - a_starts[0] < 0.04
+
+def test_failed_job_returns_none():
+    scheduler = HostScheduler()
+
+    async def job(url):
+        if url.endswith('bad'):
+            raise RuntimeError('boom')
+        return url
+
+    results = asyncio.run(scheduler.run(['https://a.example/ok', 'https://a.example/bad'], job))
+    assert results == ['https://a.example/ok', None]
+
+def test_backoff_gives_the_global_slot_to_other_hosts():
+    scheduler = HostScheduler(max_concurrency=1, per_host_concurrency=1)
+    started = time.monotonic()
+    finished = {}
+    in_flight = {'total': 0, 'peak': 0}
+
+    async def job(url):
+        in_flight['total'] += 1
+        in_flight['peak'] = max(in_flight['peak'], in_flight['total'])
+        if 'failing' in url:
+            # Waiting to retry: not running, so not counted against the budget
+            in_flight['total'] -= 1
+            await backoff_sleep(0.3)
+            in_flight['total'] += 1
+        await asyncio.sleep(0.01)
+        in_flight['total'] -= 1
+        finished[url] = time.monotonic() - started
+
+    urls = ['https://failing.example/1', 'https://healthy.example/1', 'https://healthy.example/2']
+    asyncio.run(scheduler.run(urls, job))
+
+    assert finished['https://healthy.example/2'] < 0.2 < finished['https://failing.example/1']
+    assert in_flight['peak'] == 1
+
+    # Outside a scheduler job it is a plain sleep
+    asyncio.run(backoff_sleep(0))
+
+if __name__ == "__main__":
+    test_interleave_round_robin()
+    test_limits_and_results_in_order()
+    test_request_delay_per_host()
+    test_failed_job_returns_none()
+    test_backoff_gives_the_global_slot_to_other_hosts()
+    print("All host scheduler tests passed")
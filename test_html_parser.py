@@ -0,0 +1,50 @@
+import json
+import os
+from yarl import URL
+from html_parser import available_backends, make_soup, resolve_backend
+from news_scraper import NewsScraperService
+from scraper import RealEstateScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Recorded pages, the page URL they were served from, and the expected extraction
+LISTING_FIXTURES = [
+    ('listings_commercial', 'https://www.example.co.il/realestate/commercial'),
+    ('listings_portal', 'https://www.example.co.il/realestate/commercial'),
+]
+NEWS_FIXTURES = [('news_realestate', 'https://news.example.com/realestate')]
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, f'{name}.html'), encoding='utf-8') as f:
+        html = f.read()
+    with open(os.path.join(FIXTURES, f'{name}.expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    return html, expected
+
+def test_falls_back_to_html_parser():
+    assert 'html.parser' in available_backends()
+    assert resolve_backend('no-such-parser') == available_backends()[0]
+    assert resolve_backend('html.parser') == 'html.parser'
+    assert make_soup('<p>hi</p>', 'html.parser').p.text == 'hi'
+
+def test_listing_extraction_is_identical_on_every_backend():
+    scraper = RealEstateScraper()
+    for name, page_url in LISTING_FIXTURES:
+        html, expected = load_fixture(name)
+        for backend in available_backends():
+            scraper.parser_backend = backend
+            assert scraper.parse_listings(html, URL(page_url)) == expected, f"{name} differs with {backend}"
+
+def test_news_extraction_is_identical_on_every_backend():
+    service = NewsScraperService()
+    for name, page_url in NEWS_FIXTURES:
+        html, expected = load_fixture(name)
+        for backend in available_backends():
+            service.parser_backend = backend
+            assert service.parse_articles(html, URL(page_url)) == expected, f"{name} differs with {backend}"
+
+if __name__ == "__main__":
+    test_falls_back_to_html_parser()
+    test_listing_extraction_is_identical_on_every_backend()
+    test_news_extraction_is_identical_on_every_backend()
+    print(f"All HTML parser tests passed ({', '.join(available_backends())})")
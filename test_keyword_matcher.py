@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import time
+import yaml
+from keyword_matcher import KeywordAutomaton, PropertyClassifier, get_classifier
+
+PROPERTY_TYPES = {
+    'office': {'hebrew': ['משרד', 'משרדים'], 'english': ['office', 'offices']},
+    'warehouse': {'hebrew': ['מחסן', 'מחסנים'], 'english': ['warehouse']},
+    'retail': {'hebrew': ['חנות', 'מסחרי'], 'english': ['shop']}
+}
+
+def make_classifier():
+    return PropertyClassifier(
+        commercial_keywords=['מסחרי', 'עסק', 'שטח מסחרי'],
+        residential_keywords=['דירה', 'מגורים'],
+        property_types=PROPERTY_TYPES
+    )
+
+def test_hebrew_prefixes_and_whole_words():
+    classifier = make_classifier()
+    result = classifier.classify('להשכרה: והמשרדים בקומה 3, ליד המחסן. Offices available!')
+    assert result['keywords'] == ['משרדים', 'מחסן', 'offices']
+    assert result['property_type'] == 'office' and result['category'] == 'commercial'
+
+    # Keywords only match whole words, however many prefix letters they carry
+    assert classifier.classify('משרדייה ומשרדית')['keywords'] == []
+    assert classifier.classify('ושבמשרד')['keywords'] == ['משרד']
+
+def test_phrases_and_categories():
+    automaton = KeywordAutomaton([('שטח מסחרי', 'phrase'), ('מסחרי', 'word')])
+    assert [keyword for keyword, payloads in automaton.matches('יש שטח מסחרי ובשטח המסחרי')] == [
+        'שטח מסחרי', 'מסחרי', 'שטח מסחרי', 'מסחרי'
+    ]
+
+    classifier = make_classifier()
+    assert classifier.classify('דירה 4 חדרים למגורים')['category'] == 'residential'
+    assert classifier.classify('דירה מעל חנות')['category'] == 'mixed'
+    assert classifier.classify('שלום לכולם') == {'property_type': None, 'category': None, 'keywords': []}
+    assert classifier.is_commercial('שטח מסחרי להשכרה')
+
+def test_classifier_is_rebuilt_when_config_changes():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'websites_config.yaml')
+        shutil.copy('websites_config.yaml', path)
+        first = get_classifier(path)
+        assert get_classifier(path) is first
+        assert first.classify('קליניקה להשכרה')['property_type'] is None
+
+        with open(path, encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        config['commercial_property_types']['clinic'] = {'hebrew': ['קליניקה']}
+        time.sleep(0.01)
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.dump(config, f, allow_unicode=True)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+        rebuilt = get_classifier(path)
+        assert rebuilt is not first
+        assert rebuilt.classify('קליניקה להשכרה')['property_type'] == 'clinic'
+
+if __name__ == "__main__":
+    test_hebrew_prefixes_and_whole_words()
+    test_phrases_and_categories()
+    test_classifier_is_rebuilt_when_config_changes()
+    print("All keyword matcher tests passed")
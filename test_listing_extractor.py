@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import time
+from listing_extractor import ParsePool, extract_listings, extract_page
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGE_URL = 'https://www.example.co.il/realestate/commercial'
+
+def load_listing_fixture():
+    with open(os.path.join(FIXTURES, 'listings_commercial.html'), encoding='utf-8') as f:
+        html = f.read()
+    with open(os.path.join(FIXTURES, 'listings_commercial.expected.json'), encoding='utf-8') as f:
+        return html, json.load(f)
+
+def large_page(html, copies=100):
+    start = html.index('<div class="feed">') + len('<div class="feed">')
+    end = html.index('<ul class="pagination">')
+    return html[:start] + html[start:end] * copies + html[end:]
+
+def test_pool_returns_the_same_records_as_inline_parsing():
+    html, expected = load_listing_fixture()
+    pool = ParsePool(workers=2)
+    try:
+        assert asyncio.run(pool.extract(html, PAGE_URL)) == expected
+        assert asyncio.run(ParsePool(workers=0).extract(html, PAGE_URL)) == expected
+    finally:
+        pool.shutdown()
+
+def test_event_loop_keeps_running_while_pages_parse():
+    html, expected = load_listing_fixture()
+    big = large_page(html)
+    pool = ParsePool(workers=2)
+
+    async def run():
+        # Warm the workers up so process start-up is not measured
+        await pool.extract(html, PAGE_URL)
+        gaps = []
+
+        async def ticker(stop):
+            last = time.perf_counter()
+            while not stop.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        stop = asyncio.Event()
+        tick = asyncio.ensure_future(ticker(stop))
+        results = await asyncio.gather(*(pool.extract(big, PAGE_URL) for _ in range(4)))
+        stop.set()
+        await tick
+        return results, gaps
+
+    try:
+        results, gaps = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    inline_started = time.perf_counter()
+    inline = extract_listings(big, PAGE_URL)
+    inline_seconds = time.perf_counter() - inline_started
+
+    assert all(result == inline for result in results)
+    assert len(inline) == len(expected) * 100
+    # The loop never stalled for anything close to a full page parse
+    assert max(gaps) < inline_seconds / 2
+
+def test_detector_prefers_repeated_listings_over_first_matching_selector():
+    # A filter box matches '[class*="property"]' first; the real results use a class no selector knows
+    html = """
+    <html><body>
+      <aside class="property-filters"><h3>Filter</h3><span>₪ 1,000 - ₪ 5,000</span></aside>
+      <ul>
+        <li class="result-row"><a href="/item/1"><h2>Shop in Haifa</h2></a><span>₪ 4,000</span></li>
+        <li class="result-row"><a href="/item/2"><h2>Office in Tel Aviv</h2></a><span>₪ 9,500</span></li>
+        <li class="result-row"><a href="/item/3"><h2>Warehouse in Lod</h2></a><span>₪ 12,000</span></li>
+      </ul>
+    </body></html>
+    """
+    listings = extract_listings(html, PAGE_URL)
+    assert [listing['url'] for listing in listings] == [
+        'https://www.example.co.il/item/1', 'https://www.example.co.il/item/2', 'https://www.example.co.il/item/3'
+    ]
+
+def test_remembered_container_is_reused_and_replaced_when_yield_drops():
+    html, expected = load_listing_fixture()
+
+    first = extract_page(html, PAGE_URL)
+    assert first['listings'] == expected and not first['memo_hit']
+    plan = dict(first['plan'], **{'yield': len(expected)})
+    assert plan['container'] == {'name': 'div', 'class': 'property-item'}
+
+    second = extract_page(html, PAGE_URL, plan=plan)
+    assert second['memo_hit'] and second['traversals'] == 1
+    assert second['listings'] == expected
+
+    # The site renamed its cards: the memo misses and detection finds the new container
+    redesigned = html.replace('property-item feeditem', 'ad-card')
+    third = extract_page(redesigned, PAGE_URL, plan=plan)
+    assert not third['memo_hit'] and third['traversals'] == 2
+    assert third['plan']['container'] == {'name': 'div', 'class': 'ad-card'}
+    assert third['listings'] == expected
+
+def test_partial_parse_matches_full_parse():
+    with open(os.path.join(FIXTURES, 'listings_portal.html'), encoding='utf-8') as f:
+        html = f.read()
+    full = extract_page(html, PAGE_URL)
+    plan = dict(full['plan'], **{'yield': len(full['listings'])})
+
+    partial = extract_page(html, PAGE_URL, plan=plan, partial=True)
+    assert partial['memo_hit'] and partial['traversals'] == 1
+    assert partial['listings'] == full['listings']
+
+if __name__ == "__main__":
+    test_pool_returns_the_same_records_as_inline_parsing()
+    test_event_loop_keeps_running_while_pages_parse()
+    test_detector_prefers_repeated_listings_over_first_matching_selector()
+    test_remembered_container_is_reused_and_replaced_when_yield_drops()
+    test_partial_parse_matches_full_parse()
+    print("All listing extractor tests passed")
@@ -0,0 +1,33 @@
+from pagination import (find_next_page_url, template_from_next_url, template_for_param,
+                        build_page_url, detect_pagination)
+
+def test_next_link_detection():
+    base = 'https://example.com/commercial?city=5000'
+    assert find_next_page_url('<link rel="next" href="/commercial?city=5000&amp;page=2">', base) == \
+        'https://example.com/commercial?city=5000&page=2'
+    assert find_next_page_url('<a class="pager next" href="?page=2">2</a>', base) == \
+        'https://example.com/commercial?page=2'
+    assert find_next_page_url('<a href="/commercial/page/2/"><span>הבא</span></a>', base) == \
+        'https://example.com/commercial/page/2/'
+    assert find_next_page_url('<a href="#">הבא</a><a href="/about">About</a>', base) is None
+
+def test_templates():
+    assert template_from_next_url('https://example.com/list?city=1&page=2') == \
+        'https://example.com/list?city=1&page={page}'
+    assert template_from_next_url('https://example.com/list/page/2/') == 'https://example.com/list/page/{page}/'
+    assert template_from_next_url('https://example.com/list?sort=new') is None
+    template = template_for_param('https://www.yad2.co.il/realestate/commercial?page=1&area=1', 'page')
+    assert build_page_url(template, 3) == 'https://www.yad2.co.il/realestate/commercial?area=1&page=3'
+
+def test_site_config_wins_over_detection():
+    html = '<a rel="next" href="/list?p=2">next</a>'
+    assert detect_pagination(html, 'https://example.com/list', {'url_template': 'https://example.com/list/{page}'}) == \
+        'https://example.com/list/{page}'
+    assert detect_pagination(html, 'https://example.com/list') == 'https://example.com/list?p={page}'
+    assert detect_pagination('<p>no pages</p>', 'https://example.com/list') is None
+
+if __name__ == "__main__":
+    test_next_link_detection()
+    test_templates()
+    test_site_config_wins_over_detection()
+    print("All pagination tests passed")
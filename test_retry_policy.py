@@ -0,0 +1,99 @@
+import asyncio
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from retry_policy import RetryPolicy, CircuitBreaker, parse_retry_after
+from page_fetcher import PageFetcher
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_backoff_is_bounded_and_gives_up():
+    policy = RetryPolicy(max_retries=3, base_delay=1, max_delay=5)
+    for attempt in range(3):
+        assert 0 <= policy.delay(attempt) <= min(5, 2 ** attempt)
+    assert policy.delay(3) is None
+    assert policy.delay(0, retry_after=2) == 2
+    assert policy.delay(0, retry_after=60) is None
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+def test_circuit_breaker_opens_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure('dead.example')
+    assert breaker.allow('dead.example')
+    breaker.record_failure('dead.example')
+    assert not breaker.allow('dead.example')
+    assert breaker.allow('alive.example')
+
+    clock.now = 10
+    assert breaker.allow('dead.example')      # the probe
+    assert not breaker.allow('dead.example')  # only one probe at a time
+    breaker.record_failure('dead.example')
+    assert breaker.state('dead.example') == CircuitBreaker.OPEN
+
+    clock.now = 20
+    assert breaker.allow('dead.example')
+    breaker.record_success('dead.example')
+    assert breaker.state('dead.example') == CircuitBreaker.CLOSED
+
+def test_fetch_retries_until_success():
+    calls = {'count': 0}
+
+    async def flaky(request):
+        calls['count'] += 1
+        if calls['count'] < 3:
+            return web.Response(status=503, headers={'Retry-After': '0'})
+        return web.Response(text='<html>ok</html>', content_type='text/html')
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/', flaky)
+        async with TestServer(app) as server:
+            fetcher = PageFetcher(retry_policy=RetryPolicy(max_retries=3, base_delay=0),
+                                  circuit_breaker=CircuitBreaker(failure_threshold=10))
+            async with aiohttp.ClientSession() as session:
+                return await fetcher.fetch(session, str(server.make_url('/')))
+
+    result = asyncio.run(run())
+    assert result.ok
+    assert calls['count'] == 3
+
+def test_open_circuit_skips_host():
+    async def down(request):
+        return web.Response(status=500)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', down)
+        async with TestServer(app) as server:
+            breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+            fetcher = PageFetcher(retry_policy=RetryPolicy(max_retries=5, base_delay=0),
+                                  circuit_breaker=breaker)
+            async with aiohttp.ClientSession() as session:
+                first = await fetcher.fetch(session, str(server.make_url('/a')))
+                second = await fetcher.fetch(session, str(server.make_url('/b')))
+            return first, second, server.handler.requests_count
+
+    first, second, requests = asyncio.run(run())
+    assert first.status == 500
+    assert second.error == 'circuit open'
+    assert requests == 2
+
+if __name__ == "__main__":
+    test_backoff_is_bounded_and_gives_up()
+    test_parse_retry_after()
+    test_circuit_breaker_opens_and_probes()
+    test_fetch_retries_until_success()
+    test_open_circuit_skips_host()
+    print("All retry policy tests passed")
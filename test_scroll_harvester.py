@@ -0,0 +1,103 @@
+import os
+import tempfile
+from browser_profile import SCROLL_FOR_NODES_SCRIPT, element_count
+from keyword_matcher import PropertyClassifier
+from scroll_harvester import READ_POSTS_SCRIPT, ScrollHarvester, SeenPosts, post_listing
+
+GROUP = 'https://www.facebook.com/groups/250636145007603/'
+
+class FakeFeed:
+    """Driver whose page is a feed that mounts ``batch`` more posts per scroll
+
+    With ``window``, only the last ``window`` loaded posts stay mounted, like a
+    virtualized feed that drops the nodes scrolled past.
+    """
+
+    def __init__(self, post_ids, batch=3, window=None):
+        self.post_ids = post_ids
+        self.batch = batch
+        self.window = window
+        self.mounted = batch
+        self.scrolls = 0
+
+    def get(self, url):
+        self.mounted = self.batch
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def on_screen(self):
+        loaded = self.post_ids[:self.mounted]
+        return loaded[-self.window:] if self.window else loaded
+
+    def execute_script(self, script, *args):
+        if script == READ_POSTS_SCRIPT:
+            known = set(args[3])
+            return [[post_id, f'<div>{post_id}</div>'] for post_id in self.on_screen() if post_id not in known]
+        if 'querySelectorAll' in script:
+            return len(self.on_screen())
+        raise AssertionError(f"unexpected script {script[:40]}")
+
+    def execute_async_script(self, script, *args):
+        if script == SCROLL_FOR_NODES_SCRIPT:
+            # Scrolling mounts the next batch; report whether any node was added
+            self.scrolls += 1
+            before = self.mounted
+            self.mounted = min(self.mounted + self.batch, len(self.post_ids))
+            return self.mounted > before
+        return 0
+
+def harvest(feed, seen_posts, max_posts=50):
+    harvester = ScrollHarvester(feed, "div[role='feed'] > div", seen_posts, max_posts=max_posts, scroll_timeout=0.2)
+    return [post_id for post_id, html in harvester.harvest(GROUP, GROUP)]
+
+def test_first_run_scrolls_to_the_end_of_the_feed():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        seen_posts = SeenPosts(os.path.join(cache_dir, 'seen_posts.json'))
+        feed = FakeFeed([str(number) for number in range(100, 90, -1)])
+        assert harvest(feed, seen_posts) == [str(number) for number in range(100, 90, -1)]
+        assert element_count(feed, 'div') == 10 and feed.scrolls == 4
+
+        # Capped at max_posts
+        assert harvest(FakeFeed([str(number) for number in range(10)]), None, max_posts=4) == ['0', '1', '2', '3']
+
+def test_virtualized_feed_is_read_past_the_first_screen():
+    # Three posts stay mounted whatever the scroll position, so the node count never grows
+    feed = FakeFeed([str(number) for number in range(100, 90, -1)], window=3)
+    assert harvest(feed, None) == [str(number) for number in range(100, 90, -1)]
+    assert element_count(feed, 'div') == 3 and feed.scrolls == 4
+
+def test_steady_state_run_stops_at_already_seen_posts():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, 'seen_posts.json')
+        seen_posts = SeenPosts(path)
+        harvest(FakeFeed([str(number) for number in range(100, 40, -1)]), seen_posts)
+        seen_posts.save()
+
+        # Two new posts on top of the feed: one screen is enough
+        feed = FakeFeed(['102', '101'] + [str(number) for number in range(100, 40, -1)])
+        assert harvest(feed, SeenPosts(path)) == ['102', '101']
+        assert feed.scrolls == 1
+
+        # Nothing new at all: no scrolling
+        feed = FakeFeed([str(number) for number in range(100, 40, -1)])
+        assert harvest(feed, SeenPosts(path)) == []
+        assert feed.scrolls == 0
+
+def test_commercial_posts_become_listings():
+    classifier = PropertyClassifier(commercial_keywords=['משרדים'], residential_keywords=['דירה'],
+                                    property_types={'office': {'hebrew': ['משרדים']}})
+    group = {'name': 'Office space', 'url': GROUP}
+    listing = post_listing('123', '<div><p>להשכרה משרדים 120 מ"ר, 9,500 ₪</p><img src="https://x/1.jpg"></div>',
+                           group, classifier)
+    assert listing['url'] == GROUP + 'posts/123/'
+    assert listing['price'] == 9500.0 and listing['size'] == 120.0
+    assert listing['property_type'] == 'office' and listing['image_url'] == 'https://x/1.jpg'
+    assert post_listing('124', '<div>דירה 3 חדרים להשכרה</div>', group, classifier) is None
+
+if __name__ == "__main__":
+    test_first_run_scrolls_to_the_end_of_the_feed()
+    test_virtualized_feed_is_read_past_the_first_screen()
+    test_steady_state_run_stops_at_already_seen_posts()
+    test_commercial_posts_become_listings()
+    print("All scroll harvester tests passed")
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import tempfile
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from page_fetcher import PageFetcher
+from sitemap_discovery import SitemapDiscovery, parse_sitemap
+from validator_cache import ValidatorCache
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+def urlset(entries):
+    urls = ''.join(f'<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>' for loc, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{urls}</urlset>'
+
+def test_parse_sitemap_keeps_complete_entries_of_truncated_file():
+    xml = urlset([('https://a.example/listing/1', '2024-01-01'), ('https://a.example/listing/2', '2024-01-02')])
+    kind, entries = parse_sitemap(xml[:xml.rindex('<url>') + 12])
+    assert kind == 'urlset'
+    assert entries == [('https://a.example/listing/1', '2024-01-01')]
+
+    kind, entries = parse_sitemap(f'<sitemapindex {NS}><sitemap><loc>https://a.example/s1.xml</loc></sitemap></sitemapindex>')
+    assert kind == 'index'
+    assert entries == [('https://a.example/s1.xml', None)]
+
+def test_only_new_or_modified_listings_are_fetched():
+    state = {'lastmod_1': '2024-01-01', 'index_lastmod_1': '2024-01-01'}
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        base = f'http://{request.host}'
+        if request.path == '/robots.txt':
+            return web.Response(text=f'User-agent: *\nSitemap: {base}/sitemap_index.xml\n')
+        if request.path == '/sitemap_index.xml':
+            return web.Response(content_type='application/xml', text=(
+                f'<sitemapindex {NS}>'
+                f'<sitemap><loc>{base}/listings-1.xml</loc><lastmod>{state["index_lastmod_1"]}</lastmod></sitemap>'
+                f'<sitemap><loc>{base}/listings-2.xml</loc><lastmod>2024-01-01</lastmod></sitemap>'
+                f'</sitemapindex>'))
+        if request.path == '/listings-1.xml':
+            return web.Response(content_type='application/xml', text=urlset([
+                (f'{base}/listing/1', state['lastmod_1']),
+                (f'{base}/listing/2', '2024-01-01'),
+                (f'{base}/about', '2024-01-01'),
+            ]))
+        if request.path == '/listings-2.xml':
+            return web.Response(content_type='application/xml', text=urlset([(f'{base}/listing/3', '2024-01-01')]))
+        return web.Response(status=404)
+
+    async def run(discovery, base_url):
+        async with aiohttp.ClientSession() as session:
+            site = {'base_url': base_url, 'sitemap': {'enabled': True, 'listing_pattern': r'/listing/\d+'}}
+            return await discovery.discover(session, {'test': site})
+
+    async def scenario(cache_dir):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', handler)
+        async with TestServer(app) as server:
+            base_url = str(server.make_url(''))
+            host = server.host
+            path = os.path.join(cache_dir, 'sitemaps.json')
+
+            first = SitemapDiscovery(PageFetcher(), path=path)
+            found = await run(first, base_url)
+            assert sorted(url.rsplit('/', 1)[-1] for url in found[host]) == ['1', '2', '3']
+            first.save()
+
+            # Nothing changed: the index is read, no child sitemap is
+            requests.clear()
+            second = SitemapDiscovery(PageFetcher(), path=path)
+            assert await run(second, base_url) == {host: []}
+            assert requests == ['/robots.txt', '/sitemap_index.xml']
+            second.save()
+
+            # One listing modified: only its sitemap is read and only it is reported
+            state.update(lastmod_1='2024-02-01', index_lastmod_1='2024-02-01')
+            requests.clear()
+            third = SitemapDiscovery(PageFetcher(), path=path)
+            found = await run(third, base_url)
+            assert [url.rsplit('/', 1)[-1] for url in found[host]] == ['1']
+            assert '/listings-2.xml' not in requests
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        asyncio.run(scenario(cache_dir))
+
+def test_listings_over_budget_wait_for_next_run():
+    async def handler(request):
+        base = f'http://{request.host}'
+        return web.Response(content_type='application/xml',
+                            text=urlset([(f'{base}/listing/{n}', '2024-01-01') for n in range(5)]))
+
+    async def scenario(cache_dir):
+        app = web.Application()
+        app.router.add_get('/sitemap.xml', handler)
+        async with TestServer(app) as server:
+            site = {'base_url': str(server.make_url('')), 'sitemap': {'enabled': True, 'urls': ['/sitemap.xml']}}
+            path = os.path.join(cache_dir, 'sitemaps.json')
+            batches = []
+            for _ in range(3):
+                discovery = SitemapDiscovery(PageFetcher(), path=path, max_urls=2)
+                async with aiohttp.ClientSession() as session:
+                    found = await discovery.discover(session, {'test': site})
+                batches.append(found[server.host])
+                discovery.save()
+            return batches
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        batches = asyncio.run(scenario(cache_dir))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert len({url for batch in batches for url in batch}) == 5
+
+def test_unread_child_sitemaps_are_queued_on_later_runs():
+    failing = {'/listings-1.xml'}
+
+    async def handler(request):
+        base = f'http://{request.host}'
+        if request.path == '/sitemap_index.xml':
+            body = f'<sitemapindex {NS}>' + ''.join(
+                f'<sitemap><loc>{base}/listings-{n}.xml</loc><lastmod>2024-01-01</lastmod></sitemap>'
+                for n in range(3)) + '</sitemapindex>'
+        elif request.path in failing:
+            return web.Response(status=500)
+        else:
+            n = request.path.split('-')[1].split('.')[0]
+            body = urlset([(f'{base}/listing/{n}', '2024-01-01')])
+        # The index answers 304 whenever it was fetched before, like a real server would
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        return web.Response(content_type='application/xml', text=body, headers={'ETag': '"v1"'})
+
+    async def scenario(cache_dir):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', handler)
+        async with TestServer(app) as server:
+            site = {'base_url': str(server.make_url('')),
+                    'sitemap': {'enabled': True, 'urls': ['/sitemap_index.xml']}}
+            batches = []
+            for run in range(5):
+                if run == 2:
+                    failing.clear()
+                validators = ValidatorCache(os.path.join(cache_dir, 'validators.json'))
+                discovery = SitemapDiscovery(PageFetcher(validator_cache=validators),
+                                             path=os.path.join(cache_dir, 'sitemaps.json'), max_sitemaps=2)
+                async with aiohttp.ClientSession() as session:
+                    found = await discovery.discover(session, {'test': site})
+                batches.append(sorted(url.rsplit('/', 1)[-1] for url in found[server.host]))
+                discovery.save()
+                validators.save()
+            return batches
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        batches = asyncio.run(scenario(cache_dir))
+    # Two files per run: the index plus one child. listings-1 fails until run 2 and
+    # listings-2 waits for the budget; each is picked up once it can be read
+    assert batches[0] == ['0']
+    assert sorted(url for batch in batches for url in batch) == ['0', '1', '2']
+    assert batches[-1] == []
+
+def test_robots_sitemaps_are_reused_when_robots_is_not_modified():
+    state = {'lastmod': '2024-01-01'}
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        base = f'http://{request.host}'
+        if request.path == '/robots.txt':
+            if request.headers.get('If-None-Match') == '"r1"':
+                return web.Response(status=304, headers={'ETag': '"r1"'})
+            return web.Response(text=f'Sitemap: {base}/custom-sitemap.xml\n', headers={'ETag': '"r1"'})
+        if request.path == '/custom-sitemap.xml':
+            return web.Response(content_type='application/xml',
+                                text=urlset([(f'{base}/listing/1', state['lastmod'])]))
+        return web.Response(status=404)
+
+    async def scenario(cache_dir):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', handler)
+        async with TestServer(app) as server:
+            site = {'base_url': str(server.make_url('')), 'sitemap': {'enabled': True}}
+            found = []
+            for lastmod in ('2024-01-01', '2024-02-01'):
+                state['lastmod'] = lastmod
+                validators = ValidatorCache(os.path.join(cache_dir, 'validators.json'))
+                discovery = SitemapDiscovery(PageFetcher(validator_cache=validators),
+                                             path=os.path.join(cache_dir, 'sitemaps.json'))
+                async with aiohttp.ClientSession() as session:
+                    found.append(await discovery.discover(session, {'test': site}))
+                discovery.save()
+                validators.save()
+            return found, server.host
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        found, host = asyncio.run(scenario(cache_dir))
+    assert [len(run[host]) for run in found] == [1, 1]
+    assert '/sitemap.xml' not in requests
+
+if __name__ == "__main__":
+    test_parse_sitemap_keeps_complete_entries_of_truncated_file()
+    test_only_new_or_modified_listings_are_fetched()
+    test_listings_over_budget_wait_for_next_run()
+    test_unread_child_sitemaps_are_queued_on_later_runs()
+    test_robots_sitemaps_are_reused_when_robots_is_not_modified()
+    print("All sitemap discovery tests passed")
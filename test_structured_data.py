@@ -0,0 +1,64 @@
+import os
+from extraction_plans import extract_site_page, plan_spec
+from structured_data import extract_structured_listings, find_payloads
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGE_URL = 'https://www.yad2.co.il/realestate/commercial'
+
+def load_page(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+def test_json_ld_item_list_is_mapped_to_listings():
+    listings = extract_structured_listings(load_page('structured_ld_json.html'), PAGE_URL)
+    # The site's own Organization block is not a listing
+    assert [listing['url'] for listing in listings] == [
+        'https://www.yad2.co.il/listing/5001', 'https://www.yad2.co.il/listing/5002',
+        'https://www.yad2.co.il/listing/5003'
+    ]
+    assert listings[0]['price'] == 45000.0 and listings[0]['size'] == 320.0
+    assert listings[0]['location'] == 'דרך מנחם בגין 132, תל אביב'
+    assert listings[0]['image_url'] == 'https://cdn.example-realty.co.il/5001/main.jpg'
+    assert listings[2]['price'] is None and listings[2]['location'] == 'ראשון לציון'
+
+def test_next_data_feed_is_mapped_with_url_template():
+    config = {'url_template': '/realestate/item/{token}'}
+    listings = extract_structured_listings(load_page('structured_next_data.html'), PAGE_URL, config)
+    # Private and agency feeds are both read; the navigation menu is not a feed
+    assert [listing['url'].rsplit('/', 1)[-1] for listing in listings] == ['a1b2c3', 'd4e5f6', 'g7h8i9', 'j1k2l3']
+    assert listings[0]['location'] == 'רמת גן, ז\'בוטינסקי 7'
+    assert listings[1]['property_type'] == 'חנויות' and listings[1]['size'] == 65.0
+
+    assert extract_structured_listings(load_page('structured_next_data.html'), PAGE_URL, {'enabled': False}) == []
+    assert list(find_payloads('<script>window.__INITIAL_STATE__ = {"a": [1, 2]}; render();</script>')) == [
+        ('state', {'a': [1, 2]})
+    ]
+
+def test_embedded_data_is_preferred_over_dom_extraction():
+    spec = plan_spec('yad2', {'selectors': {'listings': '.feeditem', 'title': '.title'}})
+    result = extract_site_page(load_page('structured_ld_json.html'), PAGE_URL, spec=spec)
+    assert result['method'] == 'structured' and result['traversals'] == 0
+    assert len(result['listings']) == 3
+
+    # Pages without embedded listings still go through the DOM
+    result = extract_site_page(load_page('listings_commercial.html'), PAGE_URL)
+    assert result['method'] == 'detected' and len(result['listings']) == 4
+
+def test_single_embedded_item_does_not_replace_the_dom_feed():
+    promoted = ('<script type="application/ld+json">{"@context": "https://schema.org", "@type": "Product", '
+                '"name": "משרד מקודם", "url": "/promoted/1", "offers": {"price": "9000"}}</script></head>')
+    page = load_page('listings_commercial.html').replace('</head>', promoted, 1)
+    result = extract_site_page(page, PAGE_URL)
+    assert result['method'] == 'detected' and len(result['listings']) == 4
+
+    # With nothing in the DOM, the one embedded listing is still used
+    result = extract_site_page(f'<html><head>{promoted}<body></body></html>', PAGE_URL)
+    assert result['method'] == 'structured'
+    assert [listing['url'] for listing in result['listings']] == ['https://www.yad2.co.il/promoted/1']
+
+if __name__ == "__main__":
+    test_json_ld_item_list_is_mapped_to_listings()
+    test_next_data_feed_is_mapped_with_url_template()
+    test_embedded_data_is_preferred_over_dom_extraction()
+    test_single_embedded_item_does_not_replace_the_dom_feed()
+    print("All structured data tests passed")
@@ -0,0 +1,137 @@
+import threading
+import time
+from webdriver_pool import WebDriverPool
+
+class FakeDriver:
+    started = 0
+
+    def __init__(self):
+        FakeDriver.started += 1
+        self.number = FakeDriver.started
+        self.visited = []
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise ConnectionError("browser gone")
+        return self.visited[-1] if self.visited else 'about:blank'
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+def test_drivers_are_started_once_and_reused():
+    started = []
+
+    def factory():
+        driver = FakeDriver()
+        started.append(driver)
+        return driver
+
+    pool = WebDriverPool(factory, size=2)
+    pool.start(wait=True)
+    assert len(started) == 2
+
+    for run in range(3):
+        with pool.driver() as driver:
+            driver.get(f'https://www.example.co.il/run/{run}')
+            # Scrapers may still call quit(); the pool keeps the browser
+            driver.quit()
+    assert len(started) == 2
+    assert not any(driver.quit_called for driver in started)
+    assert pool.stats()['leases'] == 3
+
+    pool.close()
+    assert all(driver.quit_called for driver in started)
+
+def test_unhealthy_and_worn_drivers_are_replaced():
+    started = []
+
+    def factory():
+        driver = FakeDriver()
+        started.append(driver)
+        return driver
+
+    pool = WebDriverPool(factory, size=1, max_pages=2)
+    with pool.driver() as driver:
+        driver.get('https://www.example.co.il/1')
+    started[0].alive = False
+    with pool.driver() as driver:
+        assert driver.driver is started[1]
+        driver.get('https://www.example.co.il/2')
+        driver.get('https://www.example.co.il/3')
+    assert started[0].quit_called and started[1].quit_called
+
+    # The worn-out browser's replacement is started in the background
+    with pool.driver() as driver:
+        assert driver.driver is started[2]
+    stats = pool.stats()
+    assert stats['unhealthy'] == 1 and stats['recycled'] == 1 and stats['live'] == 1
+    pool.close()
+
+def test_leases_wait_for_a_free_driver():
+    pool = WebDriverPool(FakeDriver, size=1)
+    first = pool.acquire()
+    try:
+        pool.acquire(timeout=0.05)
+        assert False, "acquire should time out while the only driver is leased"
+    except TimeoutError:
+        pass
+
+    borrowed = []
+    waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire(timeout=5)))
+    waiter.start()
+    pool.release(first)
+    waiter.join()
+    assert borrowed == [first]
+    pool.release(first)
+    pool.close()
+
+def test_map_spreads_items_over_drivers():
+    pool = WebDriverPool(FakeDriver, size=4)
+    pool.start(wait=True)
+
+    def scrape(driver, group):
+        driver.get(group)
+        time.sleep(0.1)
+        return [f'{group}/post']
+
+    groups = [f'https://www.facebook.com/groups/{number}' for number in range(8)]
+    started = time.perf_counter()
+    results = pool.map(scrape, groups, workers=4)
+    elapsed = time.perf_counter() - started
+    assert results == [[f'{group}/post'] for group in groups]
+    # Eight 0.1s groups on four browsers take about two rounds, not eight
+    assert elapsed < 0.5
+    assert pool.stats()['started'] == 4
+    pool.close()
+
+def test_map_drops_items_past_their_deadline():
+    pool = WebDriverPool(FakeDriver, size=2)
+
+    def scrape(driver, group):
+        if group == 'slow':
+            while driver.driver.alive and not driver.aborted:
+                time.sleep(0.01)
+            raise ConnectionError("browser gone")
+        if group == 'broken':
+            raise ValueError("layout changed")
+        return [group]
+
+    assert pool.map(scrape, ['fast', 'slow', 'broken', 'fast again'], deadline=0.2) == [
+        ['fast'], None, None, ['fast again']
+    ]
+    assert pool.stats()['unhealthy'] == 1
+    pool.close()
+
+if __name__ == "__main__":
+    test_drivers_are_started_once_and_reused()
+    test_unhealthy_and_worn_drivers_are_replaced()
+    test_leases_wait_for_a_free_driver()
+    test_map_spreads_items_over_drivers()
+    test_map_drops_items_past_their_deadline()
+    print("All WebDriver pool tests passed")
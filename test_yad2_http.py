@@ -0,0 +1,97 @@
+import asyncio
+import os
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from host_scheduler import HostScheduler
+from listing_extractor import ParsePool
+from page_fetcher import PageFetcher
+from yad2_http import Yad2HttpScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+def empty_page():
+    return '<html><body><div id="__next"><main class="feed-skeleton"></main></div></body></html>'
+
+def make_scraper(base_url, **site):
+    config = dict({
+        'name': 'Yad2 Commercial',
+        'base_url': base_url,
+        'search_path': '/realestate/commercial',
+        'selectors': {'listings': '.feeditem', 'title': '.title', 'price': '.price', 'location': '.location',
+                      'link': 'a.feed_item'},
+        'structured_data': {'url_template': '/realestate/item/{token}'},
+        'pagination': {'param': 'page', 'max_pages': 3}
+    }, **site)
+    return Yad2HttpScraper(config, settings={'partial_parse': True}, fetcher=PageFetcher(),
+                           scheduler=HostScheduler(per_host_concurrency=2), parse_pool=ParsePool(0))
+
+async def serve(handler, scenario):
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+    async with TestServer(app) as server:
+        async with aiohttp.ClientSession() as session:
+            return await scenario(str(server.make_url('')).rstrip('/'), session)
+
+def test_search_pages_are_read_without_a_browser():
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path_qs)
+        pages = {None: 'structured_next_data.html', '1': 'structured_next_data.html',
+                 '2': 'yad2_commercial_page2.html'}
+        name = pages.get(request.query.get('page'))
+        if request.path != '/realestate/commercial':
+            return web.Response(status=404)
+        return web.Response(content_type='text/html', text=load_fixture(name) if name else empty_page())
+
+    async def scenario(base_url, session):
+        return await make_scraper(base_url).scrape_listings(session)
+
+    listings = asyncio.run(serve(handler, scenario))
+    # Pages 2 and 3 are requested together; the listing repeated on page 2 is kept once
+    assert sorted(requests[1:]) == ['/realestate/commercial?page=2', '/realestate/commercial?page=3']
+    assert [listing['url'].rsplit('/', 1)[-1] for listing in listings] == [
+        'a1b2c3', 'd4e5f6', 'g7h8i9', 'j1k2l3', 'm4n5o6', 'p7q8r9'
+    ]
+    assert set(listings[0]) == {'title', 'price', 'location', 'size', 'property_type', 'description',
+                                'url', 'image_url', 'source'}
+    assert listings[4]['price'] == 31000.0 and listings[4]['location'] == 'הרצליה'
+
+def test_json_feed_is_read_when_configured():
+    async def handler(request):
+        if request.path == '/api/feed' and request.query.get('page') == '1':
+            return web.Response(content_type='application/json', text=load_fixture('yad2_feed.json'))
+        return web.Response(content_type='application/json', text='{"data": {"feed": {"feed_items": []}}}')
+
+    async def scenario(base_url, session):
+        scraper = make_scraper(base_url, structured_data={'url_template': '/realestate/item/{token}',
+                                                          'feed_url': '/api/feed?page={page}'})
+        return await scraper.scrape_listings(session)
+
+    listings = asyncio.run(serve(handler, scenario))
+    assert [listing['title'] for listing in listings] == ['קליניקה במרכז העיר', 'מגרש מסחרי']
+    assert listings[0]['url'].endswith('/realestate/item/s1t2u3') and listings[1]['size'] == 900.0
+
+def test_server_rendered_listings_use_site_selectors():
+    async def handler(request):
+        if request.query.get('page') in (None, '1'):
+            return web.Response(content_type='text/html', text=load_fixture('listings_commercial.html'))
+        return web.Response(content_type='text/html', text=empty_page())
+
+    async def scenario(base_url, session):
+        return await make_scraper(base_url).scrape_listings(session)
+
+    listings = asyncio.run(serve(handler, scenario))
+    assert [listing['url'].rsplit('/', 1)[-1] for listing in listings] == ['71234', '71235', '71236', '71237']
+    assert listings[0]['price'] == 12500.0 and listings[0]['size'] is None
+
+if __name__ == "__main__":
+    test_search_pages_are_read_without_a_browser()
+    test_json_feed_is_read_when_configured()
+    test_server_rendered_listings_use_site_selectors()
+    print("All Yad2 HTTP tests passed")
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+import time
+from urllib.parse import urlparse
+import aiohttp
+from config import Config
+from json_store import JsonStore
+
+logger = logging.getLogger(__name__)
+
+SHORTENER_HOSTS = {
+    'shorturl.at', 'bit.ly', 'tinyurl.com', 't.co', 'goo.gl', 'ow.ly',
+    'is.gd', 'cutt.ly', 'rb.gy', 'tiny.cc', 'rebrand.ly', 'did.li'
+}
+
+class UrlResolver:
+    """Expands shortened URLs once and caches the final target
+
+    Cached targets are used straight away. Once an entry is older than
+    ``ttl`` it is still used for the current run while a refresh runs in
+    the background, so a slow or failing shortener never holds up a scrape.
+    """
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600, timeout=10, shortener_hosts=None):
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, 'redirects.json'))
+        self.ttl = ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.shortener_hosts = set(shortener_hosts or SHORTENER_HOSTS)
+        self._refreshes = set()
+
+    @classmethod
+    def from_settings(cls, settings):
+        settings = settings or {}
+        return cls(
+            ttl=settings.get('redirect_cache_ttl', 7 * 24 * 3600),
+            shortener_hosts=SHORTENER_HOSTS | set(settings.get('shortener_hosts') or [])
+        )
+
+    def needs_resolution(self, url):
+        host = (urlparse(url).hostname or '').lower()
+        return host in self.shortener_hosts or url in self.store
+
+    async def resolve(self, session, url):
+        """Return the final URL a link points to"""
+        if not self.needs_resolution(url):
+            return url
+
+        entry = self.store.get(url)
+        if entry:
+            if time.time() - entry.get('resolved_at', 0) > self.ttl:
+                self._refresh_in_background(session, url)
+            return entry['target']
+
+        target = await self._expand(session, url)
+        return target or url
+
+    async def resolve_all(self, session, urls):
+        """Resolve a list of URLs concurrently, keeping their order"""
+        return list(await asyncio.gather(*(self.resolve(session, url) for url in urls)))
+
+    def _refresh_in_background(self, session, url):
+        task = asyncio.ensure_future(self._expand(session, url))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def wait_for_refreshes(self, timeout=5):
+        """Give background refreshes a chance to finish before the run ends"""
+        if self._refreshes:
+            await asyncio.wait(list(self._refreshes), timeout=timeout)
+
+    async def _expand(self, session, url):
+        """Follow redirects for a URL and cache the final target"""
+        try:
+            async with session.head(url, allow_redirects=True, timeout=self.timeout) as response:
+                target, status = str(response.url), response.status
+            if status >= 400:
+                # Some shorteners refuse HEAD; a GET follows the same redirects
+                async with session.get(url, allow_redirects=True, timeout=self.timeout) as response:
+                    target, status = str(response.url), response.status
+            if status >= 400:
+                logger.error(f"Could not resolve {url}: {status}")
+                return None
+
+            self.store.set(url, {'target': target, 'resolved_at': time.time()})
+            if target != url:
+                logger.info(f"Resolved {url} -> {target}")
+            return target
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Could not resolve {url}: {str(e) or e.__class__.__name__}")
+            return None
+
+    def save(self):
+        return self.store.save()
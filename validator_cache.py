@@ -0,0 +1,42 @@
+import os
+from config import Config
+from json_store import JsonStore
+
+class ValidatorCache:
+    """On-disk cache of HTTP validators (ETag / Last-Modified) keyed by URL"""
+
+    def __init__(self, path=None):
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, 'validators.json'))
+        self.hits = 0
+        self.misses = 0
+
+    def conditional_headers(self, url):
+        """Build If-None-Match / If-Modified-Since headers for a URL"""
+        entry = self.store.get(url) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_not_modified(self, url):
+        """Count a 304 response"""
+        self.hits += 1
+
+    def record_response(self, url, headers):
+        """Count a full download and remember its validators"""
+        self.misses += 1
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if etag or last_modified:
+            self.store.set(url, {'etag': etag, 'last_modified': last_modified})
+        elif url in self.store:
+            self.store.delete(url)
+
+    def forget(self, url):
+        """Drop validators for a URL so the next run downloads it in full"""
+        self.store.delete(url)
+
+    def save(self):
+        return self.store.save()
@@ -0,0 +1,251 @@
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class PooledDriver:
+    """A pooled WebDriver that counts the pages loaded through it
+
+    Everything except ``get()`` and ``quit()`` is passed straight to the
+    wrapped driver, so scrapers use it like a plain WebDriver.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.aborted = False
+
+    def get(self, url):
+        self.pages += 1
+        return self.driver.get(url)
+
+    def quit(self):
+        # The pool owns the browser's lifetime
+        pass
+
+    def abort(self):
+        """Kill the browser so whatever is using it fails fast; the pool replaces it"""
+        self.aborted = True
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error aborting WebDriver: {str(e)}")
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+class WebDriverPool:
+    """Pool of warm browser sessions shared by the Selenium scrapers
+
+    Up to ``size`` drivers are started once by ``factory`` and handed out
+    through ``driver()``. They stay open between runs. A driver that fails
+    its health check is replaced, and one that has loaded ``max_pages``
+    pages is recycled so a long-lived browser cannot bloat. Replacements
+    start in the background, off the next run's critical path.
+    """
+
+    def __init__(self, factory, size=2, max_pages=50, acquire_timeout=300):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.max_pages = max(1, int(max_pages))
+        self.acquire_timeout = float(acquire_timeout)
+        self._idle = queue.LifoQueue()
+        self._live = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._counters = {'started': 0, 'start_failures': 0, 'leases': 0, 'recycled': 0, 'unhealthy': 0}
+
+    @classmethod
+    def from_settings(cls, factory, settings):
+        """Create a pool from the `settings` section of websites_config.yaml"""
+        settings = settings or {}
+        return cls(
+            factory,
+            size=settings.get('webdriver_pool_size', 2),
+            max_pages=settings.get('webdriver_max_pages', 50),
+            acquire_timeout=settings.get('webdriver_acquire_timeout', 300)
+        )
+
+    def _reserve(self):
+        with self._lock:
+            if self._closed or self._live >= self.size:
+                return False
+            self._live += 1
+            return True
+
+    def _create(self):
+        """Start a driver for a reserved slot, or None"""
+        try:
+            driver = PooledDriver(self.factory())
+        except Exception as e:
+            logger.error(f"Error starting WebDriver: {str(e)}")
+            with self._lock:
+                self._counters['start_failures'] += 1
+                self._live -= 1
+            return None
+        with self._lock:
+            self._counters['started'] += 1
+        return driver
+
+    def _start_one(self):
+        driver = self._create()
+        if driver is None:
+            return
+        if self._closed:
+            self._retire(driver, 'recycled')
+        else:
+            self._idle.put(driver)
+
+    def start(self, wait=False):
+        """Start drivers until the pool is full, in the background unless ``wait``"""
+        threads = []
+        while self._reserve():
+            thread = threading.Thread(target=self._start_one, name='webdriver-start', daemon=True)
+            thread.start()
+            threads.append(thread)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def is_healthy(self, driver):
+        """Whether the browser behind a driver still answers"""
+        try:
+            driver.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _retire(self, driver, reason):
+        try:
+            driver.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting WebDriver: {str(e)}")
+        with self._lock:
+            self._counters[reason] += 1
+            self._live -= 1
+
+    def acquire(self, timeout=None):
+        """Take a healthy driver out of the pool, starting one if there is room"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve():
+                    driver = self._create()
+                    if driver is None:
+                        raise RuntimeError("Could not start a WebDriver")
+                else:
+                    try:
+                        driver = self._idle.get(timeout=timeout)
+                    except queue.Empty:
+                        raise TimeoutError(f"No WebDriver free after {timeout} seconds")
+
+            if self.is_healthy(driver):
+                with self._lock:
+                    self._counters['leases'] += 1
+                return driver
+            logger.warning("WebDriver failed its health check, replacing it")
+            self._retire(driver, 'unhealthy')
+
+    def release(self, driver):
+        """Return a driver, recycling it once it has loaded max_pages pages"""
+        if self._closed:
+            self._retire(driver, 'recycled')
+            return
+        if driver.aborted:
+            self._retire(driver, 'unhealthy')
+            self.start()
+            return
+        if driver.pages >= self.max_pages:
+            logger.info(f"Recycling WebDriver after {driver.pages} pages")
+            self._retire(driver, 'recycled')
+            self.start()
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Borrow a driver for the duration of a ``with`` block"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def map(self, func, items, workers=None, deadline=None, label=str):
+        """Run ``func(driver, item)`` for every item, on up to ``workers`` drivers at once
+
+        Results come back in item order. An item that fails yields None, and
+        so does one still running after ``deadline`` seconds: its browser is
+        killed to stop the work and replaced.
+        """
+        items = list(items)
+        if not items:
+            return []
+        workers = max(1, min(int(workers or self.size), self.size, len(items)))
+
+        def run(item):
+            with self.driver() as driver:
+                timer = threading.Timer(deadline, driver.abort) if deadline else None
+                if timer:
+                    timer.daemon = True
+                    timer.start()
+                try:
+                    result = func(driver, item)
+                except Exception:
+                    if not driver.aborted:
+                        raise
+                    result = None
+                finally:
+                    if timer:
+                        timer.cancel()
+                if driver.aborted:
+                    logger.warning(f"{label(item)} ran past its {deadline}s deadline, results dropped")
+                    return None
+                return result
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='webdriver') as executor:
+            futures = [executor.submit(run, item) for item in items]
+
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Error processing {label(item)}: {str(e)}")
+                results.append(None)
+        return results
+
+    def stats(self):
+        stats = dict(self._counters)
+        stats['live'] = self._live
+        stats['idle'] = self._idle.qsize()
+        return stats
+
+    def close(self):
+        """Quit every idle driver; leased ones are quit when released"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(driver, 'recycled')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_webdriver_pool(factory, settings=None):
+    """Return the process-wide WebDriver pool so browsers survive between runs"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WebDriverPool.from_settings(factory, settings)
+            atexit.register(_pool.close)
+        return _pool
@@ -1,6 +1,12 @@
 import yaml
 import logging
 from pathlib import Path
+from urllib.parse import urlparse
+
+def normalize_host(host):
+    """Lower-case a host name and drop a leading www."""
+    host = (host or '').lower()
+    return host[4:] if host.startswith('www.') else host
 
 class WebsiteManager:
     def __init__(self, config_path='websites_config.yaml'):
@@ -82,6 +88,27 @@ class WebsiteManager:
         """Get configuration for a specific website"""
         return self.config['websites'].get(name)
 
+    def get_site_configs(self):
+        """Get enabled website configurations that describe a scrapable site"""
+        sites = {}
+        for name, config in self.get_enabled_websites().items():
+            if not isinstance(config, dict):
+                continue
+            if config.get('base_url'):
+                sites[name] = config
+            for site in config.get('sites') or []:
+                if site.get('base_url') and site.get('enabled', True):
+                    sites[site.get('name', site['base_url'])] = site
+        return sites
+
+    def get_website_for_host(self, host):
+        """Find the enabled website configuration whose base_url is on a host"""
+        host = normalize_host(host)
+        for name, config in self.get_site_configs().items():
+            if normalize_host(urlparse(config['base_url']).hostname) == host:
+                return name, config
+        return None, None
+
     def get_settings(self):
         """Get global scraping settings"""
         return self.config.get('settings', {})
@@ -0,0 +1,106 @@
+import logging
+from urllib.parse import urljoin
+from extraction_plans import extract_site_page, plan_spec
+from host_scheduler import HostScheduler
+from http_client import get_http_client
+from listing_extractor import get_parse_pool
+from page_fetcher import PageFetcher
+from pagination import build_page_url, detect_pagination
+from structured_data import extract_feed_listings
+from website_manager import WebsiteManager
+
+logger = logging.getLogger(__name__)
+
+class Yad2HttpScraper:
+    """Reads Yad2 search results over plain HTTP instead of a browser session
+
+    Results come from the site's JSON feed when `structured_data.feed_url` is
+    configured, otherwise from the server-rendered search page: its embedded
+    listing data first, then the configured selectors. Pages 2..max_pages
+    are requested concurrently under the host scheduler's limits.
+    """
+
+    def __init__(self, site_config=None, settings=None, fetcher=None, scheduler=None, parse_pool=None):
+        manager = WebsiteManager()
+        self.site_config = site_config or manager.get_website_config('yad2_commercial')
+        self.settings = settings if settings is not None else manager.get_settings()
+        # No validator cache: every run wants the current results, not a 304
+        self.fetcher = fetcher or PageFetcher.from_settings(self.settings,
+                                                            proxy_settings=manager.get_proxy_settings())
+        self.scheduler = scheduler or HostScheduler.from_settings(self.settings)
+        self.parse_pool = parse_pool or get_parse_pool(self.settings)
+        self.parser_backend = self.settings.get('html_parser', 'auto')
+        self.partial_parse = self.settings.get('partial_parse', True)
+
+        selectors = self.site_config.get('selectors') or {}
+        self.spec = (plan_spec(self.site_config.get('name', 'Yad2'), self.site_config)
+                     if selectors.get('listings') and selectors.get('title') else None)
+        self.structured = self.site_config.get('structured_data') or {}
+        self.pagination = self.site_config.get('pagination') or {}
+        self.max_pages = int(self.pagination.get('max_pages', self.settings.get('max_pages', 5)))
+
+    def search_url(self):
+        return urljoin(self.site_config['base_url'], self.site_config.get('search_path', ''))
+
+    def feed_template(self):
+        feed_url = self.structured.get('feed_url')
+        return urljoin(self.site_config['base_url'], feed_url) if feed_url else None
+
+    async def parse(self, response):
+        """Listings on one fetched page or feed response"""
+        if self.feed_template():
+            return extract_feed_listings(response.text, response.url, self.structured)
+        result = await self.parse_pool.run(
+            extract_site_page, response.text, str(response.url), self.parser_backend,
+            self.spec, None, 0.5, self.partial_parse, self.structured
+        )
+        logger.debug(f"Parsed {response.url}: {len(result['listings'])} listings via {result['method']}")
+        return result['listings']
+
+    async def scrape_page(self, session, url):
+        response = await self.fetcher.fetch(session, url)
+        if not response.ok:
+            logger.warning(f"Could not fetch Yad2 page {url}: {response.error or response.status}")
+            return None, []
+        return response, await self.parse(response)
+
+    async def scrape_listings(self, session=None):
+        """Scrape the configured search, returning listing dicts like RealEstateScraper's"""
+        http_client = get_http_client(self.settings)
+        own_session = session is None
+        if own_session:
+            session = await http_client.get_session()
+        try:
+            template = self.feed_template()
+            first_url = build_page_url(template, 1) if template else self.search_url()
+            response, properties = await self.scrape_page(session, first_url)
+            if not properties:
+                logger.info(f"No listings on {first_url}")
+                return []
+
+            if not template and self.pagination.get('enabled') is not False:
+                template = detect_pagination(response.text, str(response.url), self.pagination)
+            if template and self.max_pages > 1:
+                page_urls = [build_page_url(template, number) for number in range(2, self.max_pages + 1)]
+
+                async def scrape_next(url):
+                    return (await self.scrape_page(session, url))[1]
+
+                for page_properties in await self.scheduler.run(page_urls, scrape_next):
+                    properties.extend(page_properties or [])
+
+            unique = {}
+            for prop in properties:
+                unique.setdefault(prop['url'] or prop['title'], prop)
+            logger.info(f"Scraped {len(unique)} Yad2 listings over HTTP")
+            return list(unique.values())
+        except Exception as e:
+            logger.error(f"Error in Yad2 HTTP scraping: {str(e)}")
+            return []
+        finally:
+            if own_session:
+                await http_client.release_session()
+
+    def scrape(self):
+        """Blocking entry point for synchronous callers"""
+        return get_http_client(self.settings).run(self.scrape_listings())